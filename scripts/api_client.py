@@ -0,0 +1,328 @@
+import csv
+import email.utils
+import re
+import threading
+import time
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Of those, the ones where the server did not act on the request, so even a
+# POST can be sent again without creating a duplicate
+UNPROCESSED_STATUSES = (429, 503)
+IDEMPOTENT_METHODS = Retry.DEFAULT_ALLOWED_METHODS
+
+# ObjectId path segments are collapsed so /projects/<id> is one endpoint
+_OBJECT_ID = re.compile(r"/[0-9a-fA-F]{24}(?=/|$)")
+
+
+def endpoint_label(method, path):
+    return f"{method} {_OBJECT_ID.sub('/{id}', path.split('?')[0])}"
+
+
+def is_retryable(method, status):
+    # A POST/PATCH that failed with a 5xx may already have been applied
+    if status in UNPROCESSED_STATUSES:
+        return True
+    return status in RETRY_STATUSES and method.upper() in IDEMPOTENT_METHODS
+
+
+class SafeRetry(Retry):
+    """
+    Retry policy that never repeats a request the server may have applied.
+    Connection errors (nothing was sent) and 429/503 are retried for every
+    method; read timeouts, connection resets and other 5xx only for
+    idempotent methods, so a slow POST /test-account cannot create two
+    accounts.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if not is_retryable(method, status_code):
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def increment(
+        self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None
+    ):
+        args = (method, url, response, error, _pool, _stacktrace)
+        if (
+            error is not None
+            and self._is_read_error(error)
+            and (method or "").upper() not in IDEMPOTENT_METHODS
+        ):
+            # Same as read=0: give up on the first read error
+            return Retry.increment(self.new(read=0), *args)
+        return super().increment(*args)
+
+
+class ApiClient:
+    """
+    Thin wrapper around a pooled, keep-alive requests.Session.
+    Holds the base URL, default auth header, timeout and retry policy so
+    callers only pass the path and payload.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        token=None,
+        pool_size=10,
+        timeout=30,
+        retries=5,
+        backoff=0.5,
+        metrics=None,
+        governor=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.metrics = metrics
+        self.governor = governor
+
+        self.session = requests.Session()
+        if token:
+            self.session.headers["x-access-token"] = token
+
+        # allowed_methods=None lets SafeRetry decide per method: POST and
+        # PATCH are only retried when the server cannot have applied them.
+        # Retry-After is honored on 429/503 responses. With a governor,
+        # status retries happen in request() instead so every thread sees the
+        # 429s and waits out Retry-After together; connection errors still
+        # retry here.
+        retry = SafeRetry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=() if governor else RETRY_STATUSES,
+            allowed_methods=None,
+            respect_retry_after_header=not governor,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path):
+        if path.startswith("http://") or path.startswith("https://"):
+            return path
+        return f"{self.base_url}{path}"
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if self.governor is None:
+            return self.send(method, path, **kwargs)
+
+        label = endpoint_label(method, path.replace(self.base_url, ""))
+        for attempt in range(self.retries + 1):
+            self.governor.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.send(method, path, retried=attempt > 0, **kwargs)
+            except requests.RequestException:
+                self.governor.release(label, "error", time.perf_counter() - start)
+                raise
+            self.governor.release(
+                label, response.status_code, time.perf_counter() - start, retry_after(response)
+            )
+            if not is_retryable(method, response.status_code) or attempt == self.retries:
+                return response
+            response.close()
+            time.sleep(self.backoff * 2**attempt)
+
+    def send(self, method, path, retried=False, **kwargs):
+        # One request through the pooled session, recorded to metrics.
+        # retried marks a status retry made by request(); urllib3's own
+        # retries show up in the response's retry history.
+        if self.metrics is None:
+            return self.session.request(method, self.url(path), **kwargs)
+
+        label = endpoint_label(method, path.replace(self.base_url, ""))
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.url(path), **kwargs)
+        except requests.RequestException:
+            self.metrics.record_http(label, "error", time.perf_counter() - start)
+            raise
+        elapsed = time.perf_counter() - start
+
+        body = response.request.body or b""
+        if kwargs.get("stream"):
+            received = int(response.headers.get("Content-Length") or 0)
+        else:
+            received = len(response.content)
+        retries = getattr(response.raw, "retries", None)
+        self.metrics.record_http(
+            label,
+            response.status_code,
+            elapsed,
+            sent=len(body),
+            received=received,
+            retries=(len(retries.history) if retries else 0) + int(retried),
+        )
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class RateLimiter:
+    # Spaces out calls so that at most `rate` start per second across threads
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def retry_after(response):
+    # Seconds from a Retry-After header (delta-seconds or HTTP date), if any
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
+
+
+class Governor:
+    """
+    Adaptive limit on in-flight requests, shared by every thread using one
+    ApiClient. Each healthy response grows the limit by 1/limit (about +1
+    per round of requests), and eight times slower once it is back within
+    reach of the limit that last failed. A 429, 5xx, connection error or a
+    response slower than latency_factor times its endpoint's healthy
+    baseline cuts it by `decrease`, at most once per baseline latency (and
+    never more often than min_cut_interval) so one burst of failures counts
+    once. Baselines are kept per endpoint label, so a mix of fast and slow
+    endpoints is not read as a spike, and slow samples still feed the
+    baseline so a lasting latency shift becomes the new normal.
+    A Retry-After pauses every thread until it has passed.
+    Worker pools should be sized to `maximum` so this is the real limit.
+    """
+
+    def __init__(
+        self,
+        initial=4,
+        minimum=1,
+        maximum=64,
+        decrease=0.5,
+        latency_factor=3.0,
+        warmup=20,
+        min_cut_interval=0.1,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.warmup = warmup
+        self.min_cut_interval = min_cut_interval
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.baselines = {}
+        self.samples = defaultdict(int)
+        self.last_cut = 0.0
+        self.ceiling = float(maximum)
+        self.started = time.monotonic()
+        self.trace = [(0.0, initial, 0, "start")]
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait <= 0 and self.in_flight < int(self.limit):
+                    break
+                self.condition.wait(timeout=wait if wait > 0 else None)
+            self.in_flight += 1
+
+    def release(self, label, status, elapsed, retry_after=None):
+        with self.condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            baseline = self.baselines.get(label)
+            if status == "error" or status == 429 or status >= 500:
+                self._cut(now, baseline, f"status {status} on {label}")
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                    self._log(now, f"paused {retry_after:.1f}s for Retry-After")
+            elif self.samples[label] >= self.warmup and elapsed > self.latency_factor * baseline:
+                self._cut(now, baseline, f"latency {elapsed * 1000:.0f} ms on {label}")
+                self._observe(label, elapsed)
+            else:
+                self._observe(label, elapsed)
+                previous = int(self.limit)
+                step = 1 / self.limit
+                if self.limit >= 0.9 * self.ceiling:
+                    step /= 8
+                self.limit = min(self.maximum, self.limit + step)
+                if int(self.limit) != previous:
+                    self._log(now, "increase")
+            self.condition.notify_all()
+
+    def _observe(self, label, elapsed):
+        baseline = self.baselines.get(label)
+        self.samples[label] += 1
+        self.baselines[label] = elapsed if baseline is None else 0.9 * baseline + 0.1 * elapsed
+
+    def _cut(self, now, baseline, reason):
+        if now - self.last_cut < max(baseline or 0, self.min_cut_interval):
+            return
+        self.last_cut = now
+        self.ceiling = self.limit
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self._log(now, reason)
+
+    def _log(self, now, reason):
+        self.trace.append((now - self.started, int(self.limit), self.in_flight, reason))
+
+    def print_summary(self):
+        limits = [limit for _, limit, _, _ in self.trace]
+        cuts = sum(1 for *_, reason in self.trace if reason.startswith(("status", "latency")))
+        print(
+            f"Concurrency: ended at {int(self.limit)}, peak {max(limits)}, "
+            f"{cuts} cuts over {len(self.trace)} changes"
+        )
+
+    def write(self, path):
+        with open(path, mode="w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["seconds", "limit", "in_flight", "reason"])
+            writer.writerows((f"{t:.3f}", limit, busy, reason) for t, limit, busy, reason in self.trace)
@@ -0,0 +1,99 @@
+from bson import ObjectId
+
+# Indexes the attendance queries rely on. Without them the checkins match
+# and the per-user profile lookup fall back to collection scans.
+ATTENDANCE_INDEXES = {
+    "checkins": [("item", 1), ("user", 1)],
+    "profiles": [("user", 1)],
+}
+
+
+def attendance_pipeline(event_id, profile_filter=None):
+    # Starts from the checkins for one item (index-served) and joins only
+    # those users' profiles, filtered by any profile attributes
+    profile_match = {"$expr": {"$eq": ["$user", "$$user"]}}
+    profile_match.update(profile_filter or {})
+
+    return [
+        {"$match": {"item": ObjectId(event_id)}},
+        {"$group": {"_id": "$user"}},
+        {
+            "$lookup": {
+                "from": "profiles",
+                "let": {"user": "$_id"},
+                "pipeline": [
+                    {"$match": profile_match},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "firstName": 1, "lastName": 1, "school": 1}},
+                ],
+                "as": "profile",
+            }
+        },
+        {"$unwind": "$profile"},
+        {
+            "$lookup": {
+                "from": "users",
+                "let": {"user": "$_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$user"]}}},
+                    {"$project": {"_id": 0, "email": 1}},
+                ],
+                "as": "user",
+            }
+        },
+        {
+            "$project": {
+                "profile": 1,
+                "email": {"$arrayElemAt": ["$user.email", 0]},
+            }
+        },
+    ]
+
+
+def get_attendees(db, event_id, **profile_filter):
+    return list(
+        db["checkins"].aggregate(attendance_pipeline(event_id, profile_filter))
+    )
+
+
+def count_attendees(db, event_id, **profile_filter):
+    pipeline = attendance_pipeline(event_id, profile_filter)[:4]
+    pipeline.append({"$count": "count"})
+    result = list(db["checkins"].aggregate(pipeline))
+    return result[0]["count"] if result else 0
+
+
+def _find_collscans(plan):
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            yield plan
+        for value in plan.values():
+            yield from _find_collscans(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _find_collscans(value)
+
+
+def check_query_plans(db, event_id, **profile_filter):
+    # Explains the checkins match and the per-user profile lookup, and returns
+    # the collections that would be served by a COLLSCAN
+    explained = {
+        "checkins": db.command(
+            "aggregate",
+            "checkins",
+            pipeline=attendance_pipeline(event_id, profile_filter),
+            explain=True,
+        ),
+        "profiles": db["profiles"].find({"user": ObjectId()}).explain(),
+    }
+
+    flagged = [name for name, plan in explained.items() if any(_find_collscans(plan))]
+    for name in flagged:
+        print(f"WARNING: attendance query does a COLLSCAN on {name}")
+    return flagged
+
+
+def ensure_attendance_indexes(db):
+    for collection, keys in ATTENDANCE_INDEXES.items():
+        for key in keys:
+            db[collection].create_index([key])
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from dotenv import load_dotenv
+
+from api_client import ApiClient
+from populate import project_payload, schedule_payload, table_number_payload, team_payload
+
+load_dotenv()
+
+API_URL = "https://dev.backend.tartanhacks.com"
+JWT_SECRET = os.getenv("JWT_SECRET")
+
+# A run regresses if p95 latency or error rate grows, or throughput drops,
+# by more than this fraction of the baseline
+REGRESSION_TOLERANCE = 0.2
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def timed(self, endpoint, call):
+        start = time.perf_counter()
+        try:
+            response = call()
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.samples.setdefault(endpoint, []).append((elapsed, ok))
+        return response if ok else None
+
+
+def workflow(api, recorder, created, table_number=1, check_in_item_id=None, prize_id=None):
+    # One iteration of the calls populate.py makes, in dependency order and
+    # with populate's payloads. Everything created is appended to `created`
+    # as (kind, _id, user token) so cleanup() can remove it afterwards.
+    response = recorder.timed(
+        "POST /test-account", lambda: api.post("/test-account?status=CONFIRMED")
+    )
+    if response is None:
+        return
+    user = response.json()
+    created.append(("user", user["_id"], user["token"]))
+
+    response = recorder.timed(
+        "POST /team/",
+        lambda: api.post(
+            "/team/", json=team_payload(user), headers={"x-access-token": user["token"]}
+        ),
+    )
+    if response is None:
+        return
+    team = response.json()
+    created.append(("team", team["_id"], user["token"]))
+
+    response = recorder.timed(
+        "POST /projects", lambda: api.post("/projects", json=project_payload(team))
+    )
+    if response is None:
+        return
+    project = response.json()
+    created.append(("project", project["_id"], None))
+
+    recorder.timed(
+        "PATCH /projects/{id}/table-number",
+        lambda: api.patch(
+            f"/projects/{project['_id']}/table-number",
+            json=table_number_payload(table_number),
+        ),
+    )
+    recorder.timed("POST /judges/", lambda: api.post("/judges/", json=[user["email"]]))
+    if check_in_item_id:
+        recorder.timed(
+            "PUT /check-in/user",
+            lambda: api.put(
+                "/check-in/user",
+                params={"userID": user["_id"], "checkInItemID": check_in_item_id},
+            ),
+        )
+    if prize_id:
+        recorder.timed(
+            "PUT /projects/prizes/enter/{id}",
+            lambda: api.put(
+                f"/projects/prizes/enter/{project['_id']}", params={"prizeID": prize_id}
+            ),
+        )
+    response = recorder.timed(
+        "POST /schedule",
+        lambda: api.post(
+            "/schedule",
+            json=schedule_payload(
+                {
+                    "name": "Benchmark event",
+                    "description": "A schedule item created by the benchmark",
+                    "startTime": 0,
+                    "endTime": 0,
+                    "location": "Nowhere",
+                }
+            ),
+        ),
+    )
+    if response is not None:
+        created.append(("schedule", response.json()["_id"], None))
+
+
+def cleanup(api, created, workers=8):
+    # Deletes what the workflows created, dependents first. A team is only
+    # removed once its last member leaves it. Not timed.
+    from teardown import run_concurrently
+
+    calls = {
+        "project": lambda _id, token: api.delete(f"/projects/{_id}"),
+        "team": lambda _id, token: api.post("/team/leave", headers={"x-access-token": token}),
+        "schedule": lambda _id, token: api.delete(f"/schedule/{_id}"),
+        "user": lambda _id, token: api.delete(f"/test-account/{_id}"),
+    }
+    for kind, call in calls.items():
+        items = [(_id, token) for created_kind, _id, token in created if created_kind == kind]
+        if items:
+            run_concurrently(
+                f"Cleaning up {kind}s", items, lambda item: call(*item), workers=workers
+            )
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    summary = {}
+    for endpoint, entries in samples.items():
+        latencies = sorted(elapsed * 1000 for elapsed, _ in entries)
+        errors = sum(1 for _, ok in entries if not ok)
+        summary[endpoint] = {
+            "count": len(entries),
+            "errors": errors,
+            "error_rate": errors / len(entries),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "throughput_rps": len(entries) / duration if duration else None,
+        }
+    return summary
+
+
+def run_level(base_url, concurrency, iterations, keep=False, **workflow_args):
+    # Retries are disabled so every failure shows up in the error rate.
+    # Unless keep is set, everything the level created is deleted after it.
+    api = ApiClient(base_url, token=JWT_SECRET, pool_size=concurrency, retries=0)
+    recorder = Recorder()
+    created = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i in range(iterations):
+            executor.submit(
+                workflow, api, recorder, created, table_number=i + 1, **workflow_args
+            )
+    duration = time.perf_counter() - start
+    if not keep:
+        cleanup(api, created, workers=concurrency)
+    api.close()
+    return {"duration_s": duration, "endpoints": summarize(recorder.samples, duration)}
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    regressions = []
+    for level, run in results["runs"].items():
+        base_run = baseline.get("runs", {}).get(level)
+        if base_run is None:
+            continue
+        for endpoint, stats in run["endpoints"].items():
+            base = base_run["endpoints"].get(endpoint)
+            if base is None:
+                continue
+            if base["p95_ms"] and stats["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"c={level} {endpoint}: p95 {base['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms"
+                )
+            if stats["error_rate"] > base["error_rate"] + tolerance * max(base["error_rate"], 0.01):
+                regressions.append(
+                    f"c={level} {endpoint}: error rate {base['error_rate']:.2%} -> {stats['error_rate']:.2%}"
+                )
+            if base["throughput_rps"] and stats["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                regressions.append(
+                    f"c={level} {endpoint}: throughput {base['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} req/s"
+                )
+    return regressions
+
+
+def print_results(results):
+    for level, run in results["runs"].items():
+        print(f"\nconcurrency {level} ({run['duration_s']:.2f}s)")
+        print(f"{'endpoint':<36} {'n':>6} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'req/s':>8}")
+        for endpoint, stats in run["endpoints"].items():
+            print(
+                f"{endpoint:<36} {stats['count']:>6} {stats['error_rate']:>6.1%} "
+                f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+                f"{stats['throughput_rps']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the endpoints populate.py uses")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--iterations", type=int, default=50, help="workflows per level")
+    parser.add_argument("--check-in-item", help="check-in item _id for PUT /check-in/user")
+    parser.add_argument("--prize", help="prize _id for PUT /projects/prizes/enter")
+    parser.add_argument("--out", default="../data/benchmark.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the accounts, teams and projects created"
+    )
+    parser.add_argument("--offline", action="store_true", help="run against a local stub server")
+    parser.add_argument("--latency-ms", type=float, default=10)
+    parser.add_argument("--jitter-ms", type=float, default=2)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    url = args.url
+    if args.offline:
+        from stub_server import StubConfig, serve_in_thread
+
+        server = serve_in_thread(
+            StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+        )
+        url = f"http://127.0.0.1:{server.server_port}"
+
+    results = {"target": url, "started_at": time.time(), "runs": {}}
+    for level in args.concurrency:
+        results["runs"][str(level)] = run_level(
+            url,
+            level,
+            args.iterations,
+            keep=args.keep,
+            check_in_item_id=args.check_in_item,
+            prize_id=args.prize,
+        )
+    print_results(results)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions against baseline")
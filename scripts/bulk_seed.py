@@ -0,0 +1,340 @@
+import argparse
+import datetime
+import os
+import random
+
+import pymongo
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from teardown import is_dev_database
+
+# Every bulk-seeded user shares this password, hashed once per run
+PASSWORD = "bulk-seed-password"
+# Matches User.generateHash in src/models/User.ts
+BCRYPT_ROUNDS = 8
+
+SCHOOLS = [
+    "Carnegie Mellon University",
+    "Crimson Magenta University",
+    "Carved Watermelon University",
+    "Marvel Cinematic Universe",
+    "Carnegie Carnegie Carnegie",
+]
+GENDERS = ["Male", "Female", "Prefer not to say", "Other"]
+ETHNICITIES = [
+    "Native American",
+    "Asian",
+    "Black",
+    "Pacific Islander",
+    "White",
+    "Hispanic",
+    "Prefer not to say",
+    "Other",
+]
+
+
+def hash_password(password=PASSWORD):
+    import bcrypt
+
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+
+
+def get_event_id(db):
+    # Same lookup as getTartanHacks in src/controllers/EventController.ts
+    event = db["events"].find_one({"name": "TartanHacks"}, {"_id": 1})
+    if event is not None:
+        return event["_id"]
+    now = datetime.datetime.utcnow()
+    return db["events"].insert_one(
+        {
+            "name": "TartanHacks",
+            "website": "http://tartanhacks.com/",
+            "enableCheckin": True,
+            "enableProjects": True,
+            "enableTeams": True,
+            "enableSponsors": True,
+            "essayQuestions": [],
+            "createdAt": now,
+            "updatedAt": now,
+            "__v": 0,
+        }
+    ).inserted_id
+
+
+# Document builders; shapes follow the schemas in src/models/
+
+
+def timestamps(now):
+    return {"createdAt": now, "updatedAt": now, "__v": 0}
+
+
+def user_document(email, password_hash, now, status="CONFIRMED"):
+    return {
+        "_id": ObjectId(),
+        "email": email,
+        "password": password_hash,
+        "admin": False,
+        "judge": False,
+        "company": None,
+        "status": status,
+        **timestamps(now),
+    }
+
+
+def profile_document(event_id, user, now, rng, **overrides):
+    display_name = user["email"].split("@")[0]
+    first_name, _, last_name = display_name.partition("-")
+    profile = {
+        "_id": ObjectId(),
+        "event": event_id,
+        "user": user["_id"],
+        "firstName": first_name,
+        "lastName": last_name or first_name,
+        "displayName": display_name,
+        "age": rng.choice([18, 19, 20, 21, 22, 23, 24]),
+        "school": rng.choice(SCHOOLS),
+        "graduationYear": 2026,
+        "gender": rng.choice(GENDERS),
+        "ethnicity": rng.choice(ETHNICITIES),
+        "phoneNumber": "1234567890",
+        "github": display_name,
+        "totalPoints": 0,
+        "sponsorRanking": [],
+        "dietaryRestrictions": [],
+        "wantsTravelReimbursement": False,
+        "tartanHacksCodeOfConductAcknowledgement": True,
+        "tartanHacksMediaReleaseAcknowledgement": True,
+        "tartanHacksMediaReleaseSignature": display_name,
+        "tartanHacksMediaReleaseDate": now,
+        "mlhCodeOfConductAcknowledgement": True,
+        "mlhTermsAndConditionsAcknowledgement": True,
+        "mlhEmailSubscription": True,
+        "confirmation": {
+            "_id": ObjectId(),
+            "signatureLiability": True,
+            "willMentor": False,
+        },
+        "attendingPhysically": True,
+        **timestamps(now),
+    }
+    profile.update(overrides)
+    return profile
+
+
+def team_document(event_id, name, members, now):
+    return {
+        "_id": ObjectId(),
+        "event": event_id,
+        "name": name,
+        "description": "A team created by the bulk seeder",
+        "admin": members[0],
+        "members": list(members),
+        "visible": True,
+        **timestamps(now),
+    }
+
+
+def project_document(event_id, team, prizes, now, table_number=None, presenting_virtually=False):
+    project = {
+        "_id": ObjectId(),
+        "event": event_id,
+        "name": f"Project for {team['name']}",
+        "description": "A project created by the bulk seeder",
+        "url": "http://example.com",
+        "slides": "http://example.com/slides",
+        "video": "http://example.com/video",
+        "team": team["_id"],
+        "prizes": list(prizes),
+        "presentingVirtually": presenting_virtually,
+        "submitted": True,
+        **timestamps(now),
+    }
+    if table_number is not None:
+        project["tableNumber"] = str(table_number)
+    return project
+
+
+def check_in_item_document(event_id, name, points, now, start_time=0, end_time=0):
+    return {
+        "_id": ObjectId(),
+        "event": event_id,
+        "name": name,
+        "description": "A check-in item created by the bulk seeder",
+        "startTime": start_time,
+        "endTime": end_time,
+        "points": points,
+        "accessLevel": "ALL",
+        "active": True,
+        "enableSelfCheckin": False,
+        **timestamps(now),
+    }
+
+
+def checkin_document(event_id, user_id, item_id, now):
+    return {
+        "_id": ObjectId(),
+        "event": event_id,
+        "user": user_id,
+        "item": item_id,
+        **timestamps(now),
+    }
+
+
+def prize_document(event_id, name, now, required_talk=()):
+    return {
+        "_id": ObjectId(),
+        "event": event_id,
+        "name": name,
+        "description": "A prize created by the bulk seeder",
+        "eligibility": "Everyone",
+        "requiredTalk": list(required_talk),
+        **timestamps(now),
+    }
+
+
+class BulkWriter:
+    # Buffers documents per collection and flushes them with unordered
+    # insert_many once a buffer reaches batch_size
+    def __init__(self, db, batch_size=5000):
+        self.db = db
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, collection, document):
+        buffer = self.buffers.setdefault(collection, [])
+        buffer.append(document)
+        if len(buffer) >= self.batch_size:
+            self.flush(collection)
+
+    def flush(self, collection=None):
+        for name in [collection] if collection else list(self.buffers):
+            buffer = self.buffers.get(name)
+            if buffer:
+                self.db[name].insert_many(buffer, ordered=False)
+                self.counts[name] = self.counts.get(name, 0) + len(buffer)
+                self.buffers[name] = []
+
+    def write(self, records):
+        # records yields (collection, document) pairs
+        for collection, document in records:
+            self.add(collection, document)
+        self.flush()
+        return self.counts
+
+
+def synthetic_records(
+    event_id,
+    password_hash,
+    n_users,
+    team_size=4,
+    n_prizes=10,
+    n_check_in_items=10,
+    checkins_per_user=2,
+    seed=None,
+    prefix=None,
+):
+    # References are built in memory from generated _ids, so nothing has
+    # to be read back from the database
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    # Team names are unique, so each run gets its own prefix by default
+    prefix = prefix or f"bulk{os.urandom(2).hex()}"
+
+    prizes = [prize_document(event_id, f"Prize {prefix}-{i}", now) for i in range(n_prizes)]
+    items = [
+        check_in_item_document(event_id, f"Check-in {prefix}-{i}", 10, now)
+        for i in range(n_check_in_items)
+    ]
+    for prize in prizes:
+        yield "prizes", prize
+    for item in items:
+        yield "checkin-items", item
+
+    team = []
+    team_index = 0
+    for i in range(n_users):
+        user = user_document(f"{prefix}-{i}@tartanhacks.com", password_hash, now)
+        yield "users", user
+        # checkInUser adds each item's points to totalPoints, so the profile
+        # starts with the sum of the check-ins seeded for it
+        attended = rng.sample(items, min(checkins_per_user, len(items)))
+        yield "profiles", profile_document(
+            event_id, user, now, rng, totalPoints=sum(item["points"] for item in attended)
+        )
+        for item in attended:
+            yield "checkins", checkin_document(event_id, user["_id"], item["_id"], now)
+
+        team.append(user["_id"])
+        if len(team) == team_size or i == n_users - 1:
+            team_doc = team_document(event_id, f"Team {prefix}-{team_index}", team, now)
+            yield "teams", team_doc
+            entered = rng.sample(prizes, min(len(prizes), rng.randint(0, 2)))
+            yield "projects", project_document(
+                event_id, team_doc, [prize["_id"] for prize in entered], now
+            )
+            team = []
+            team_index += 1
+
+
+def bulk_seed(db, n_users, batch_size=5000, realistic=False, **options):
+    # realistic=True uses the skewed distributions from synthetic.generate
+    if not is_dev_database(db.name):
+        raise ValueError(f"Refusing to bulk seed {db.name}")
+    event_id = get_event_id(db)
+    if realistic:
+        from synthetic import generate
+
+        records = generate(event_id, hash_password(), n_users, **options)
+    else:
+        records = synthetic_records(event_id, hash_password(), n_users, **options)
+    counts = BulkWriter(db, batch_size).write(records)
+    for collection, count in counts.items():
+        print(f"Inserted {count} documents into {collection}")
+    return counts
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Seed synthetic data directly into MongoDB")
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="tartanhacks-25-dev")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--team-size", type=int, default=4)
+    parser.add_argument("--prizes", type=int, default=10)
+    parser.add_argument("--check-in-items", type=int, default=10)
+    parser.add_argument("--checkins-per-user", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--prefix", help="email/name prefix (default: random per run)")
+    parser.add_argument(
+        "--realistic", action="store_true", help="team sizes, schools and check-ins from skewed distributions"
+    )
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(args.uri)
+    if args.realistic:
+        bulk_seed(
+            client[args.db],
+            args.users,
+            batch_size=args.batch_size,
+            realistic=True,
+            n_prizes=args.prizes,
+            n_talks=args.check_in_items,
+            mean_checkins=args.checkins_per_user,
+            seed=args.seed,
+            prefix=args.prefix,
+        )
+    else:
+        bulk_seed(
+            client[args.db],
+            args.users,
+            batch_size=args.batch_size,
+            team_size=args.team_size,
+            n_prizes=args.prizes,
+            n_check_in_items=args.check_in_items,
+            checkins_per_user=args.checkins_per_user,
+            seed=args.seed,
+            prefix=args.prefix,
+        )
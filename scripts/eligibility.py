@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+
+def as_list(value):
+    # requiredTalk is a list after migrate_required_talk_to_list, a single
+    # id (or null) before it
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class EligibilityIndex:
+    """
+    In-memory copy of the checks enterProject makes in
+    src/controllers/ProjectsController.ts, built with one query per
+    collection: a project may enter a prize if the prize has no existing
+    required talks, or if any member of its team checked in to any of them.
+    """
+
+    def __init__(self, db, project_ids, prize_ids):
+        self.projects = {
+            project["_id"]: project
+            for project in db["projects"].find(
+                {"_id": {"$in": list(project_ids)}}, {"team": 1, "event": 1, "prizes": 1}
+            )
+        }
+        self.prizes = {
+            prize["_id"]: as_list(prize.get("requiredTalk"))
+            for prize in db["prizes"].find({"_id": {"$in": list(prize_ids)}}, {"requiredTalk": 1})
+        }
+        self.teams = {
+            team["_id"]: set(team.get("members") or [])
+            for team in db["teams"].find(
+                {"_id": {"$in": [p.get("team") for p in self.projects.values()]}},
+                {"members": 1},
+            )
+        }
+
+        talk_ids = {talk for talks in self.prizes.values() for talk in talks}
+        self.talk_events = {
+            item["_id"]: item.get("event")
+            for item in db["checkin-items"].find({"_id": {"$in": list(talk_ids)}}, {"event": 1})
+        }
+        members = set().union(*self.teams.values()) if self.teams else set()
+        self.attendees = defaultdict(set)
+        for checkin in db["checkins"].find(
+            {"item": {"$in": list(self.talk_events)}, "user": {"$in": list(members)}},
+            {"user": 1, "item": 1, "_id": 0},
+        ):
+            self.attendees[checkin["item"]].add(checkin["user"])
+
+    def check(self, project_id, prize_id):
+        # Returns None if the pair is eligible, otherwise the reason it is not
+        project = self.projects.get(project_id)
+        if project is None:
+            return "unknown project"
+        if prize_id not in self.prizes:
+            return "unknown prize"
+        if prize_id in (project.get("prizes") or []):
+            return "already entered"
+        members = self.teams.get(project.get("team"))
+        if members is None:
+            return "team not found"
+
+        talks = [talk for talk in self.prizes[prize_id] if talk in self.talk_events]
+        if not talks:
+            return None
+        for talk in talks:
+            # The server only counts check-ins to items of the project's event
+            if self.talk_events[talk] == project.get("event") and members & self.attendees[talk]:
+                return None
+        return "no team member attended a required talk"
@@ -0,0 +1,177 @@
+import csv
+import gzip
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pymongo
+
+
+class ExportSpec:
+    """
+    Declarative description of one CSV export.
+    pipeline is a list of aggregation stages, or a function taking the
+    database and returning one (for stages that depend on lookups).
+    fields maps each CSV column to a dotted path in the pipeline output.
+    row, if given, builds the CSV row from a document instead of fields.
+    Use module-level functions so specs can be sent to worker processes.
+    """
+
+    def __init__(self, name, collection, pipeline, fields, row=None):
+        self.name = name
+        self.collection = collection
+        self.pipeline = pipeline
+        self.fields = fields
+        self.row = row
+
+    def resolve_pipeline(self, db):
+        if callable(self.pipeline):
+            return self.pipeline(db)
+        return list(self.pipeline)
+
+    def to_row(self, document):
+        if self.row is not None:
+            return self.row(document)
+        return {
+            column: format_value(get_path(document, path))
+            for column, path in self.fields.items()
+        }
+
+
+def get_path(document, path):
+    value = document
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(format_value(v) for v in value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def open_output(path, compress, mode="w"):
+    if compress:
+        return gzip.open(path, mode + "t", newline="")
+    return open(path, mode, newline="")
+
+
+def id_range_match(lo, hi):
+    bounds = {}
+    if lo is not None:
+        bounds["$gte"] = lo
+    if hi is not None:
+        bounds["$lt"] = hi
+    return {"$match": {"_id": bounds}} if bounds else None
+
+
+def export(db, spec, path, compress=False, batch_size=1000, id_range=None, header=True, pipeline=None):
+    # Cursor-driven: rows are written as batches arrive, so memory stays flat
+    # regardless of collection size
+    pipeline = pipeline if pipeline is not None else spec.resolve_pipeline(db)
+    if id_range is not None:
+        match = id_range_match(*id_range)
+        if match:
+            pipeline = [match] + pipeline
+
+    count = 0
+    cursor = db[spec.collection].aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
+    with open_output(path, compress) as f:
+        writer = csv.DictWriter(f, fieldnames=list(spec.fields))
+        if header:
+            writer.writeheader()
+        for document in cursor:
+            writer.writerow(spec.to_row(document))
+            count += 1
+    return count
+
+
+def split_id_ranges(collection, parts, sample_per_part=50):
+    # Approximate equal-sized _id ranges from a random sample of _ids
+    if parts <= 1:
+        return [(None, None)]
+    sample = sorted(
+        document["_id"]
+        for document in collection.aggregate(
+            [{"$sample": {"size": parts * sample_per_part}}, {"$project": {"_id": 1}}]
+        )
+    )
+    if not sample:
+        return [(None, None)]
+    step = len(sample) / parts
+    bounds = sorted(set(sample[int(step * i)] for i in range(1, parts)))
+    edges = [None] + bounds + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _export_range(uri, db_name, spec, pipeline, path, compress, batch_size, id_range):
+    client = pymongo.MongoClient(uri)
+    try:
+        return export(
+            client[db_name],
+            spec,
+            path,
+            compress=compress,
+            batch_size=batch_size,
+            id_range=id_range,
+            header=False,
+            pipeline=pipeline,
+        )
+    finally:
+        client.close()
+
+
+def export_parallel(uri, db_name, spec, path, processes=4, compress=False, batch_size=1000, sharded=False):
+    # Splits the collection into _id ranges and exports each range from its
+    # own process. Shards are either kept as path.part-N files (with a header
+    # each) or concatenated into path. Gzip members concatenate into a valid
+    # gzip stream, so compressed shards are joined without recompressing.
+    # Returns the row count and the files written.
+    client = pymongo.MongoClient(uri)
+    try:
+        db = client[db_name]
+        pipeline = spec.resolve_pipeline(db)
+        ranges = split_id_ranges(db[spec.collection], processes)
+    finally:
+        client.close()
+
+    shard_paths = [f"{path}.part-{i}" for i in range(len(ranges))]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [
+            executor.submit(
+                _export_range, uri, db_name, spec, pipeline, shard_path, compress, batch_size, id_range
+            )
+            for shard_path, id_range in zip(shard_paths, ranges)
+        ]
+        count = sum(future.result() for future in futures)
+
+    header_path = f"{path}.header"
+    with open_output(header_path, compress) as f:
+        csv.DictWriter(f, fieldnames=list(spec.fields)).writeheader()
+
+    if sharded:
+        for shard_path in shard_paths:
+            joined = f"{shard_path}.tmp"
+            _concatenate([header_path, shard_path], joined)
+            os.replace(joined, shard_path)
+        os.remove(header_path)
+        return count, shard_paths
+
+    _concatenate([header_path] + shard_paths, path)
+    for part in [header_path] + shard_paths:
+        os.remove(part)
+    return count, [path]
+
+
+def _concatenate(paths, destination):
+    with open(destination, "wb") as out:
+        for part in paths:
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out)
@@ -0,0 +1,222 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pymongo
+from dotenv import load_dotenv
+from pymongo.errors import OperationFailure
+
+from teardown import is_dev_database
+
+BASE_DB = "tartanhacks-25-dev"
+BATCH_SIZE = 10000
+# Indexes declared by the Mongoose models in src/models/. Seeding with raw
+# insert_many builds none of them, so they are created on the template for
+# every shard to copy.
+MODEL_INDEXES = {
+    "teams": [
+        ([("name", pymongo.ASCENDING)], {"unique": True}),
+        ([("name", pymongo.TEXT)], {}),
+    ],
+    "profiles": [
+        (
+            [
+                ("firstName", pymongo.TEXT),
+                ("lastName", pymongo.TEXT),
+                ("displayName", pymongo.TEXT),
+            ],
+            {},
+        ),
+    ],
+}
+# index_information() fields that are not options to create_index
+INDEX_INFO_ONLY = {"v", "key", "ns"}
+
+
+def template_name(base=BASE_DB):
+    return f"{base}-template"
+
+
+def shard_name(index, base=BASE_DB):
+    return f"{base}-shard-{index}"
+
+
+def check_dev(name):
+    if not is_dev_database(name):
+        raise ValueError(f"Refusing to write fixtures into {name}")
+
+
+def seed_template(client, n_users, base=BASE_DB, **options):
+    # Seeds the template once; every shard is cloned from it afterwards
+    from bulk_seed import bulk_seed
+
+    template = client[template_name(base)]
+    check_dev(template.name)
+    client.drop_database(template.name)
+    counts = bulk_seed(template, n_users, **options)
+    for collection, indexes in MODEL_INDEXES.items():
+        for keys, index_options in indexes:
+            template[collection].create_index(keys, **index_options)
+    return counts
+
+
+def copy_indexes(source, target):
+    # Every option is carried over, including the weights and language
+    # settings a text index needs to be rebuilt from its _fts/_ftsx key
+    for name, info in source.index_information().items():
+        if name == "_id_":
+            continue
+        options = {key: value for key, value in info.items() if key not in INDEX_INFO_ONLY}
+        target.create_index(info["key"], name=name, **options)
+
+
+def clone_collection(source, target, batch_size=BATCH_SIZE):
+    # Streams the source in large batches into an empty target collection,
+    # then builds the indexes once over the loaded data
+    target.drop()
+    count = 0
+    batch = []
+    for document in source.find({}, batch_size=batch_size):
+        batch.append(document)
+        if len(batch) >= batch_size:
+            target.insert_many(batch, ordered=False)
+            count += len(batch)
+            batch = []
+    if batch:
+        target.insert_many(batch, ordered=False)
+        count += len(batch)
+    copy_indexes(source, target)
+    return count
+
+
+def collection_names(db):
+    return [name for name in db.list_collection_names() if not name.startswith("system.")]
+
+
+def collection_hashes(db):
+    # Per-collection content hashes, or None where dbHash is not allowed
+    try:
+        return db.command("dbHash")["collections"]
+    except OperationFailure:
+        return None
+
+
+def clone_collections(client, template, targets, workers=8, batch_size=BATCH_SIZE):
+    """
+    Copies the given template collections into each target database.
+    targets maps a database name to the collections it needs; every
+    (database, collection) pair is copied concurrently.
+    """
+    source = client[template]
+    tasks = [(name, collection) for name, collections in targets.items() for collection in collections]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        counts = list(
+            executor.map(
+                lambda task: clone_collection(
+                    source[task[1]], client[task[0]][task[1]], batch_size
+                ),
+                tasks,
+            )
+        )
+    return sum(counts)
+
+
+def clone_shards(client, n_shards, base=BASE_DB, workers=8, batch_size=BATCH_SIZE):
+    # Replaces base-shard-0 .. base-shard-(n-1) with fresh copies of the template
+    template = template_name(base)
+    targets = [shard_name(i, base) for i in range(n_shards)]
+    # Every name is checked before anything is read, dropped or cloned
+    for name in [template] + targets:
+        check_dev(name)
+    collections = collection_names(client[template])
+    targets = {name: collections for name in targets}
+    for name in targets:
+        client.drop_database(name)
+
+    started = time.perf_counter()
+    count = clone_collections(client, template, targets, workers, batch_size)
+    print(
+        f"Cloned {template} into {n_shards} shards "
+        f"({count} documents) in {time.perf_counter() - started:.1f}s"
+    )
+    return list(targets)
+
+
+def reset_to_template(client, name, base=BASE_DB, workers=8, batch_size=BATCH_SIZE):
+    """
+    Puts a database back into the template's state in place. Collections
+    the template does not have are dropped. Where the server allows dbHash,
+    only collections whose contents differ from the template are recopied,
+    so resetting after a test that touched two collections copies two.
+    """
+    check_dev(name)
+    template = template_name(base)
+    db = client[name]
+    wanted = collection_names(client[template])
+    for collection in set(collection_names(db)) - set(wanted):
+        db.drop_collection(collection)
+
+    stale = wanted
+    template_hashes = collection_hashes(client[template])
+    hashes = collection_hashes(db) if template_hashes is not None else None
+    if hashes is not None:
+        stale = [
+            collection
+            for collection in wanted
+            if hashes.get(collection) != template_hashes.get(collection)
+        ]
+
+    started = time.perf_counter()
+    count = clone_collections(client, template, {name: stale}, workers, batch_size)
+    print(
+        f"Reset {name}: recopied {len(stale)}/{len(wanted)} collections "
+        f"({count} documents) in {time.perf_counter() - started:.1f}s"
+    )
+    return stale
+
+
+def drop_shards(client, base=BASE_DB):
+    prefix = shard_name("", base)
+    names = [name for name in client.list_database_names() if name.startswith(prefix)]
+    for name in names:
+        check_dev(name)
+    for name in names:
+        client.drop_database(name)
+        print(f"Dropped {name}")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Template and per-shard fixture databases")
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--base", default=BASE_DB)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="bulk seed the template database")
+    seed.add_argument("--users", type=int, default=1000)
+    seed.add_argument("--seed", type=int, default=0)
+    seed.add_argument("--realistic", action="store_true")
+
+    clone = commands.add_parser("clone", help="clone the template into N shard databases")
+    clone.add_argument("shards", type=int)
+
+    reset = commands.add_parser("reset", help="reset databases to the template in place")
+    reset.add_argument("databases", nargs="+", help="database names or shard numbers")
+
+    commands.add_parser("drop", help="drop every shard database")
+    args = parser.parse_args()
+
+    client = pymongo.MongoClient(args.uri)
+    if args.command == "seed":
+        seed_template(client, args.users, args.base, seed=args.seed, realistic=args.realistic)
+    elif args.command == "clone":
+        clone_shards(client, args.shards, args.base, args.workers, args.batch_size)
+    elif args.command == "reset":
+        for database in args.databases:
+            name = shard_name(database, args.base) if database.isdigit() else database
+            reset_to_template(client, name, args.base, args.workers, args.batch_size)
+    else:
+        drop_shards(client, args.base)
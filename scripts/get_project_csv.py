@@ -1,120 +1,467 @@
+import argparse
+import csv
+import functools
+import hashlib
+import json
 import pymongo
 import dotenv
 import os
+from datetime import datetime
+
+from bson import ObjectId
+
+from exporter import ExportSpec, export, export_parallel, open_output
 
 # load env variables
 dotenv.load_dotenv("../.env")
 
 MONGO_CONNECTION_STRING = os.getenv("MONGODB_URI")
 
-if not MONGO_CONNECTION_STRING:
-    raise ValueError("MONGODB_URI not set in .env")
-
 # Project Database - Change to tartanhacks-25
 TARTANHACKS_DB = "tartanhacks-24"
 
 # Output file
 PROJECT_FILE = "../data/24_projects.csv"
 
+# High-water mark and row keys for incremental exports of PROJECT_FILE
+WATERMARK_FILE = "../data/24_projects.watermark.json"
+
 # Prizes to consider
 # The script will only write projects that have submitted to at least one of these prizes
 # Leave empty to consider all prizes
 PRIZES_TO_CONSIDER = ["PLS Logistics Prize", "Ripple XRP Ledger Prize"]
 
-# connect to mongo
-client = pymongo.MongoClient(MONGO_CONNECTION_STRING)
-db = client[TARTANHACKS_DB]
+# Cursor batch size for the export; rows are written as each batch arrives
+BATCH_SIZE = 500
+
+FIELDS = ["name", "description", "url", "slides", "video", "team_name", "prizes_of_interest"]
 
-def load_project_info():
-    collection = db["projects"]
-    pipeline = [
+
+def changed_since(watermark):
+    # Projects updated after the (updatedAt, _id) watermark, in watermark order
+    if watermark is None:
+        return [{"$sort": {"updatedAt": 1, "_id": 1}}]
+    updated_at, last_id = watermark
+    return [
         {
-            "$lookup": {
-                "from": "teams",
-                "localField": "team",
-                "foreignField": "_id",
-                "as": "team_info"
+            "$match": {
+                "$or": [
+                    {"updatedAt": {"$gt": updated_at}},
+                    {"updatedAt": updated_at, "_id": {"$gt": last_id}},
+                ]
             }
         },
+        {"$sort": {"updatedAt": 1, "_id": 1}},
+    ]
+
+
+def build_pipeline(prize_ids, incremental=False, watermark=None):
+    # Filter on prizes first so the lookups only run for matching projects.
+    # Incremental pipelines filter on the watermark instead and keep every
+    # changed project: one that no longer matches comes back with no prizes,
+    # which tells the caller to drop its row.
+    if prize_ids is None:
+        match = {"prizes.0": {"$exists": True}}
+        prize_match = {"$expr": {"$in": ["$_id", "$$prizes"]}}
+    else:
+        match = {"prizes": {"$in": prize_ids}}
+        prize_match = {
+            "_id": {"$in": prize_ids},
+            "$expr": {"$in": ["$_id", "$$prizes"]},
+        }
+
+    fields = {
+        "_id": 0,
+        "name": 1,
+        "description": 1,
+        "url": 1,
+        "slides": 1,
+        "video": 1,
+        "team_name": {"$arrayElemAt": ["$team_info.name", 0]},
+        "prizes": "$prizes_info.name",
+    }
+    if incremental:
+        fields.update({"_id": 1, "updatedAt": 1})
+
+    stages = changed_since(watermark) if incremental else [{"$match": match}]
+    return stages + [
         {
-            "$unwind": {
-                "path": "$team_info",
-                "preserveNullAndEmptyArrays": True
+            "$lookup": {
+                "from": "teams",
+                "let": {"team": "$team"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$team"]}}},
+                    {"$project": {"_id": 0, "name": 1}},
+                ],
+                "as": "team_info"
             }
         },
         {
             "$lookup": {
                 "from": "prizes",
-                "localField": "prizes",
-                "foreignField": "_id",
+                "let": {"prizes": "$prizes"},
+                "pipeline": [
+                    {"$match": prize_match},
+                    {"$project": {"_id": 0, "name": 1}},
+                ],
                 "as": "prizes_info"
             }
         },
+        {"$project": fields},
+    ]
+
+
+def project_row(proj):
+    proj_cleaned = {}
+    for field in FIELDS:
+        if field == "prizes_of_interest":
+            proj_cleaned[field] = f"\"{', '.join(proj['prizes'])}\""
+        elif proj.get(field) is None:
+            proj_cleaned[field] = None
+        else:
+            proj_cleaned[field] = \
+                f"\"{proj[field]}\"" if "," in proj[field] else proj[field]
+    return proj_cleaned
+
+
+def prize_ids_to_consider(db):
+    if not PRIZES_TO_CONSIDER:
+        return None
+    return [
+        prize["_id"]
+        for prize in db["prizes"].find({"name": {"$in": PRIZES_TO_CONSIDER}}, {"_id": 1})
+    ]
+
+
+def projects_pipeline(db):
+    return build_pipeline(prize_ids_to_consider(db))
+
+
+def lookup_one(collection, local_field, field, as_field):
+    # Joins a single field from another collection by _id
+    return [
         {
             "$lookup": {
-                "from": "users",
-                "localField": "team_info.members",
-                "foreignField": "_id",
-                "as": "team_info.members"
-            }
-        },
-        {
-            "$project": {
-                "_id": 0,
-                "team": 0,
-                "name": 1,
-                "description": 1,
-                "url": 1,
-                "slides": 1,
-                "video": 1,
-                "team": 1,
-                "prizes": 1,
-                "team_name": "$team_info.name",
-                "prizes": "$prizes_info",
+                "from": collection,
+                "let": {"id": f"${local_field}"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$id"]}}},
+                    {"$project": {"_id": 0, field: 1}},
+                ],
+                "as": as_field
             }
         },
+        {"$set": {as_field: {"$arrayElemAt": [f"${as_field}.{field}", 0]}}},
     ]
 
-    projects = collection.aggregate(pipeline)
 
-    # write to CSV
-    import csv
+SPECS = {
+    spec.name: spec
+    for spec in [
+        ExportSpec(
+            "projects",
+            "projects",
+            projects_pipeline,
+            {field: field for field in FIELDS},
+            row=project_row,
+        ),
+        ExportSpec(
+            "users",
+            "users",
+            [{"$project": {"email": 1, "status": 1, "admin": 1, "judge": 1, "createdAt": 1}}],
+            {
+                "_id": "_id",
+                "email": "email",
+                "status": "status",
+                "admin": "admin",
+                "judge": "judge",
+                "createdAt": "createdAt",
+            },
+        ),
+        ExportSpec(
+            "profiles",
+            "profiles",
+            [
+                {
+                    "$project": {
+                        "user": 1,
+                        "firstName": 1,
+                        "lastName": 1,
+                        "displayName": 1,
+                        "school": 1,
+                        "major": 1,
+                        "graduationYear": 1,
+                        "totalPoints": 1,
+                    }
+                }
+            ],
+            {
+                "user": "user",
+                "firstName": "firstName",
+                "lastName": "lastName",
+                "displayName": "displayName",
+                "school": "school",
+                "major": "major",
+                "graduationYear": "graduationYear",
+                "totalPoints": "totalPoints",
+            },
+        ),
+        ExportSpec(
+            "checkins",
+            "checkins",
+            lookup_one("users", "user", "email", "user_email")
+            + lookup_one("checkin-items", "item", "name", "item_name")
+            + [{"$project": {"user_email": 1, "item_name": 1, "createdAt": 1}}],
+            {
+                "user_email": "user_email",
+                "item_name": "item_name",
+                "createdAt": "createdAt",
+            },
+        ),
+        ExportSpec(
+            "bookmarks",
+            "bookmarks",
+            lookup_one("users", "user", "email", "user_email")
+            + lookup_one("users", "participant", "email", "participant_email")
+            + lookup_one("projects", "project", "name", "project_name")
+            + [
+                {
+                    "$project": {
+                        "user_email": 1,
+                        "participant_email": 1,
+                        "project_name": 1,
+                        "bookmarkType": 1,
+                        "description": 1,
+                    }
+                }
+            ],
+            {
+                "user_email": "user_email",
+                "bookmarkType": "bookmarkType",
+                "participant_email": "participant_email",
+                "project_name": "project_name",
+                "description": "description",
+            },
+        ),
+    ]
+}
+
+
+def output_path(name, compress):
+    path = PROJECT_FILE if name == "projects" else f"../data/{name}.csv"
+    return f"{path}.gz" if compress else path
+
+
+def connection_string(uri=None):
+    uri = uri or MONGO_CONNECTION_STRING
+    if not uri:
+        raise ValueError("MONGODB_URI not set in .env")
+    return uri
+
+
+@functools.lru_cache(maxsize=None)
+def get_client(uri):
+    return pymongo.MongoClient(uri)
+
+
+def get_database(uri=None, db_name=None):
+    # One client per deployment, connected on first use: importing this
+    # module for the project CSV format opens no connection
+    return get_client(connection_string(uri))[db_name or TARTANHACKS_DB]
+
+
+def run_export(name, compress=False, processes=1, sharded=False, uri=None, db_name=None):
+    spec = SPECS[name]
+    path = output_path(name, compress)
+
     # Check if directory exists
     if not os.path.exists("../data"):
         os.makedirs("../data")
 
-    with open(PROJECT_FILE, "w") as f:
-        fields = ["name", "description", "url", "slides", "video", "team_name", "prizes_of_interest"]
-        writer = csv.DictWriter(
-            f,
-            fieldnames=fields
+    # A full rewrite invalidates the row keys of the incremental export
+    if name == "projects" and os.path.exists(WATERMARK_FILE):
+        os.remove(WATERMARK_FILE)
+
+    if processes > 1:
+        count, paths = export_parallel(
+            connection_string(uri),
+            db_name or TARTANHACKS_DB,
+            spec,
+            path,
+            processes=processes,
+            compress=compress,
+            batch_size=BATCH_SIZE,
+            sharded=sharded,
         )
+    else:
+        database = get_database(uri, db_name)
+        count = export(database, spec, path, compress=compress, batch_size=BATCH_SIZE)
+        paths = [path]
+    print(f"Exported {count} {name} to {', '.join(paths)}")
+
+
+def write_projects(projects, compress=False):
+    # Writes already-loaded projects (name, description, url, slides, video,
+    # team_name and prizes of interest) to PROJECT_FILE in the same format
+    # as the projects export, e.g. rows read from a local snapshot
+    path = output_path("projects", compress)
+    if not os.path.exists("../data"):
+        os.makedirs("../data")
+    if os.path.exists(WATERMARK_FILE):
+        os.remove(WATERMARK_FILE)
+
+    spec = SPECS["projects"]
+    count = 0
+    with open_output(path, compress) as f:
+        writer = csv.DictWriter(f, fieldnames=list(spec.fields))
         writer.writeheader()
+        for project in projects:
+            writer.writerow(spec.to_row(project))
+            count += 1
+    print(f"Exported {count} projects to {path}")
+    return count
+
+
+def csv_fingerprint():
+    stat = os.stat(PROJECT_FILE)
+    return [stat.st_size, stat.st_mtime_ns]
+
 
-        for proj in list(projects):
-            submitted_to_prizes_to_consider = False
-            proj_cleaned = {}
+def export_source(uri=None, db_name=None):
+    # Names the database an export was read from; the connection string is
+    # hashed so its credentials are not written next to the CSV
+    digest = hashlib.sha256(connection_string(uri).encode()).hexdigest()[:16]
+    return f"{digest}/{db_name or TARTANHACKS_DB}"
 
-            for field in fields:
-                if field == "prizes_of_interest":
-                    prizes = [prize["name"] for prize in proj["prizes"]]
-                    if PRIZES_TO_CONSIDER:
-                        prizes = filter(lambda x: x in PRIZES_TO_CONSIDER, prizes)
 
-                    if prizes:
-                        submitted_to_prizes_to_consider = True
+def read_watermark(source):
+    # Returns ((updatedAt, _id), row keys), or (None, None) if there is no
+    # usable previous export of `source` to merge into. Keys pair with CSV
+    # rows by position, so they are only trusted if the CSV is byte-for-byte
+    # the file the last incremental run of the same database wrote.
+    if not os.path.exists(WATERMARK_FILE) or not os.path.exists(PROJECT_FILE):
+        return None, None
+    with open(WATERMARK_FILE) as f:
+        state = json.load(f)
+    if state.get("source") != source or state.get("csv") != csv_fingerprint():
+        return None, None
+    watermark = None
+    if state["updatedAt"] is not None:
+        watermark = (datetime.fromisoformat(state["updatedAt"]), ObjectId(state["_id"]))
+    return watermark, state["keys"]
 
-                    proj_cleaned[field] = f"\"{', '.join(prizes)}\""
-                elif field not in proj:
-                    proj_cleaned[field] = None
-                else:
-                    proj_cleaned[field] = \
-                        f"\"{proj[field]}\"" if "," in proj[field] else proj[field]
 
-            if not submitted_to_prizes_to_consider:
-                continue
+def write_watermark(watermark, keys, source):
+    updated_at, last_id = watermark if watermark else (None, None)
+    state = {
+        "source": source,
+        "updatedAt": updated_at.isoformat() if updated_at else None,
+        "_id": str(last_id) if last_id else None,
+        "keys": keys,
+        "csv": csv_fingerprint(),
+    }
+    temporary = f"{WATERMARK_FILE}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(state, f)
+    os.replace(temporary, WATERMARK_FILE)
+
+
+def export_projects_incremental(full=False, uri=None, db_name=None):
+    """
+    Merges projects changed since the last run into PROJECT_FILE, keyed on
+    project _id, then advances the (updatedAt, _id) watermark. The database
+    only reads changed projects; renaming a team or prize does not touch
+    project updatedAt, so run with full=True after doing that.
+    """
+    if not os.path.exists("../data"):
+        os.makedirs("../data")
+
+    db = get_database(uri, db_name)
+    source = export_source(uri, db_name)
+    watermark, keys = (None, None) if full else read_watermark(source)
+    rows = {}
+    if keys is not None:
+        with open(PROJECT_FILE, newline="") as f:
+            rows = dict(zip(keys, csv.DictReader(f)))
+
+    upserted = removed = 0
+    pipeline = build_pipeline(prize_ids_to_consider(db), incremental=True, watermark=watermark)
+    for project in db["projects"].aggregate(pipeline, batchSize=BATCH_SIZE):
+        key = str(project["_id"])
+        if project["prizes"]:
+            rows[key] = project_row(project)
+            upserted += 1
+        elif rows.pop(key, None) is not None:
+            removed += 1
+        if project.get("updatedAt") is not None:
+            watermark = (project["updatedAt"], project["_id"])
+
+    temporary = f"{PROJECT_FILE}.tmp"
+    with open(temporary, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows.values())
+    os.replace(temporary, PROJECT_FILE)
+    write_watermark(watermark, list(rows), source)
+    print(
+        f"Upserted {upserted} and removed {removed} projects; "
+        f"{len(rows)} projects in {PROJECT_FILE}"
+    )
+
+
+def ensure_watermark_index(uri=None, db_name=None):
+    # Lets the incremental export seek to the watermark instead of scanning
+    get_database(uri, db_name)["projects"].create_index(
+        [("updatedAt", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]
+    )
+
+
+def load_project_info(incremental=False):
+    if incremental:
+        export_projects_incremental()
+    else:
+        run_export("projects")
 
-            writer.writerow(proj_cleaned)
 
 if __name__ == "__main__":
-    load_project_info()
+    parser = argparse.ArgumentParser(description="Export collections to CSV")
+    parser.add_argument(
+        "exports", nargs="*", help=f"any of {', '.join(sorted(SPECS))} (default: projects)"
+    )
+    parser.add_argument("--uri", default=MONGO_CONNECTION_STRING, help="MongoDB URI (default: MONGODB_URI)")
+    parser.add_argument("--db", default=TARTANHACKS_DB, help=f"database (default: {TARTANHACKS_DB})")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output files")
+    parser.add_argument("--processes", type=int, default=1, help="export _id ranges in parallel")
+    parser.add_argument("--sharded", action="store_true", help="keep one file per range")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="projects: merge only projects changed since the last incremental run",
+    )
+    parser.add_argument(
+        "--create-index", action="store_true", help="create the updatedAt/_id index first"
+    )
+    args = parser.parse_args()
+
+    unknown = [name for name in args.exports if name not in SPECS]
+    if unknown:
+        parser.error(f"unknown exports: {', '.join(unknown)}")
+
+    if args.create_index:
+        ensure_watermark_index(args.uri, args.db)
+
+    if args.incremental:
+        if args.exports not in ([], ["projects"]) or args.gzip or args.processes > 1:
+            parser.error("--incremental only supports an uncompressed projects export")
+        export_projects_incremental(uri=args.uri, db_name=args.db)
+        raise SystemExit
+
+    for name in args.exports or ["projects"]:
+        run_export(
+            name,
+            compress=args.gzip,
+            processes=args.processes,
+            sharded=args.sharded,
+            uri=args.uri,
+            db_name=args.db,
+        )
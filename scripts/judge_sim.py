@@ -0,0 +1,216 @@
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import ApiClient
+from benchmark import Recorder, print_results, summarize
+
+API_URL = "https://dev.backend.tartanhacks.com"
+JUDGING_URL = "https://dev.judging.tartanhacks.com"
+
+
+class ThinkTime:
+    # Pause between a judge's actions, in seconds
+    def __init__(self, distribution, mean, rng):
+        self.distribution = distribution
+        self.mean = mean
+        self.rng = rng
+        self.lock = threading.Lock()
+
+    def sample(self):
+        if self.mean <= 0:
+            return 0
+        with self.lock:
+            if self.distribution == "constant":
+                return self.mean
+            if self.distribution == "uniform":
+                return self.rng.uniform(0, 2 * self.mean)
+            if self.distribution == "lognormal":
+                sigma = 0.75
+                return self.rng.lognormvariate(math.log(self.mean) - sigma**2 / 2, sigma)
+            return self.rng.expovariate(1 / self.mean)
+
+
+def read_judges(path="../data/judges.csv"):
+    with open(path, mode="r") as judges_file:
+        return [row for row in csv.DictReader(judges_file) if row["email"]]
+
+
+def first_id(payload):
+    if isinstance(payload, list):
+        payload = payload[0] if payload else {}
+    if isinstance(payload, dict):
+        return payload.get("_id") or payload.get("id")
+    return None
+
+
+def login(judge, backend, recorder):
+    # Returns the judge's access token, or None if logging in failed.
+    # /auth/login/judging only returns the judge's role, so the token comes
+    # from /auth/login when it is not in that response.
+    credentials = {"email": judge["email"], "password": judge["password"]}
+    response = recorder.timed(
+        "POST /auth/login/judging",
+        lambda: backend.post("/auth/login/judging", json=credentials),
+    )
+    if response is None:
+        return None
+    token = response.json().get("token")
+    if token:
+        return token
+    response = recorder.timed(
+        "POST /auth/login", lambda: backend.post("/auth/login", json=credentials)
+    )
+    return response.json().get("token") if response is not None else None
+
+
+def judge_session(judge, backend, judging, recorder, think, rounds, projects_path, score_path, rng):
+    token = login(judge, backend, recorder)
+    if token is None:
+        return
+    headers = {"x-access-token": token}
+
+    for _ in range(rounds):
+        time.sleep(think.sample())
+        response = recorder.timed(
+            f"GET {projects_path}",
+            lambda: judging.get(
+                projects_path, params={"email": judge["email"]}, headers=headers
+            ),
+        )
+        if response is None:
+            continue
+        project_id = first_id(response.json())
+
+        time.sleep(think.sample())
+        recorder.timed(
+            f"POST {score_path}",
+            lambda: judging.post(
+                score_path,
+                json={
+                    "email": judge["email"],
+                    "project": project_id,
+                    "score": rng.randint(1, 10),
+                },
+                headers=headers,
+            ),
+        )
+
+
+def simulate(
+    judges,
+    backend_url,
+    judging_url,
+    projects_path,
+    score_path,
+    rounds=5,
+    think_distribution="exponential",
+    think_mean=2.0,
+    seed=None,
+):
+    # Every judge logs in at once, after a single synchronize, then runs
+    # `rounds` fetch-and-score cycles with think time between actions.
+    # projects_path and score_path are the judging service's routes for
+    # the next project to judge and for submitting a score.
+    if not projects_path or not score_path:
+        raise ValueError("simulate needs the judging service's projects and score paths")
+    rng = random.Random(seed)
+    think = ThinkTime(think_distribution, think_mean, rng)
+    recorder = Recorder()
+    workers = max(1, len(judges))
+    backend = ApiClient(backend_url, pool_size=workers, retries=0)
+    judging = ApiClient(judging_url, pool_size=workers, retries=0)
+
+    start = time.perf_counter()
+    recorder.timed("GET /api/synchronize", lambda: judging.get("/api/synchronize"))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for judge in judges:
+            executor.submit(
+                judge_session,
+                judge,
+                backend,
+                judging,
+                recorder,
+                think,
+                rounds,
+                projects_path,
+                score_path,
+                random.Random(rng.random()),
+            )
+    duration = time.perf_counter() - start
+
+    backend.close()
+    judging.close()
+    return {"duration_s": duration, "endpoints": summarize(recorder.samples, duration)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate concurrent judges")
+    parser.add_argument("--judges-file", default="../data/judges.csv")
+    parser.add_argument("--judges", type=int, help="only use the first N judges")
+    parser.add_argument("--api-url", default=API_URL)
+    parser.add_argument("--judging-url", default=JUDGING_URL)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--think", choices=["exponential", "lognormal", "uniform", "constant"], default="exponential"
+    )
+    parser.add_argument("--think-mean", type=float, default=2.0, help="seconds")
+    parser.add_argument(
+        "--projects-path",
+        required=True,
+        help="judging service route that returns the next project to judge",
+    )
+    parser.add_argument(
+        "--score-path", required=True, help="judging service route that accepts a score"
+    )
+    parser.add_argument("--out", default="../data/judge_sim.json")
+    parser.add_argument("--offline", action="store_true", help="run against a local stub server")
+    parser.add_argument("--offline-judges", type=int, default=80)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    api_url, judging_url = args.api_url, args.judging_url
+    if args.offline:
+        from stub_server import StubConfig, serve_in_thread
+
+        server = serve_in_thread(
+            StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+        )
+        api_url = judging_url = f"http://127.0.0.1:{server.server_port}"
+
+    if args.offline and not os.path.exists(args.judges_file):
+        judges = [
+            {"email": f"judge-{i}@tartanhacks.com", "password": "stub"}
+            for i in range(args.offline_judges)
+        ]
+    else:
+        judges = read_judges(args.judges_file)
+    judges = judges[: args.judges] if args.judges else judges
+
+    run = simulate(
+        judges,
+        api_url,
+        judging_url,
+        args.projects_path,
+        args.score_path,
+        rounds=args.rounds,
+        think_distribution=args.think,
+        think_mean=args.think_mean,
+        seed=args.seed,
+    )
+    results = {"api": api_url, "judging": judging_url, "runs": {str(len(judges)): run}}
+    print_results(results)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote results to {args.out}")
@@ -0,0 +1,65 @@
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+SEPARATORS = " \t\n\r,"
+# Characters that can follow a complete number or literal inside an array
+DELIMITERS = SEPARATORS + "]"
+
+
+def iter_json_array(chunks):
+    """
+    Yields the elements of a top-level JSON array as they arrive, from an
+    iterable of byte chunks, holding at most one partial element in memory.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    started = exhausted = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in SEPARATORS:
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                # Objects, arrays and strings end on their own closing
+                # character. A number or literal is only complete once the
+                # character after it has arrived: "1." or "2e" decode as a
+                # shorter number that the next chunk would continue.
+                closed = isinstance(item, (dict, list, str))
+                if closed or (end < len(buffer) and buffer[end] in DELIMITERS):
+                    yield item
+                    position = end
+                    continue
+
+        if exhausted:
+            raise ValueError("Unterminated JSON array")
+        chunk = next(chunks, None)
+        exhausted = chunk is None
+        buffer = buffer[position:] + text.decode(chunk or b"", final=exhausted)
+        position = 0
+
+
+def iter_list(api, path, chunk_size=CHUNK_SIZE, **kwargs):
+    # Streams a list endpoint: items are yielded while the body downloads
+    response = api.get(path, stream=True, **kwargs)
+    try:
+        response.raise_for_status()
+        yield from iter_json_array(response.iter_content(chunk_size))
+    finally:
+        response.close()
@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+from collections import defaultdict
+
+
+class Metrics:
+    """
+    Thread-safe counters and timings for HTTP and Mongo operations.
+    Every sample is kept for the summary table and the metrics file.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.status_counts = defaultdict(int)
+        self.bytes_sent = defaultdict(int)
+        self.bytes_received = defaultdict(int)
+        self.retries = defaultdict(int)
+        self.started_at = time.time()
+
+    def record_http(self, label, status, elapsed, sent=0, received=0, retries=0):
+        with self.lock:
+            self.timings[label].append(elapsed)
+            self.status_counts[(label, status)] += 1
+            self.bytes_sent[label] += sent
+            self.bytes_received[label] += received
+            self.retries[label] += retries
+
+    def record_mongo(self, label, elapsed, ok=True):
+        with self.lock:
+            self.timings[label].append(elapsed)
+            self.status_counts[(label, "ok" if ok else "error")] += 1
+
+    def record(self, label, elapsed):
+        with self.lock:
+            self.timings[label].append(elapsed)
+
+    def timed(self, label):
+        return _Timer(self, label)
+
+    def rows(self):
+        with self.lock:
+            for label, samples in sorted(self.timings.items()):
+                ordered = sorted(samples)
+                statuses = {
+                    str(status): count
+                    for (row_label, status), count in self.status_counts.items()
+                    if row_label == label
+                }
+                yield {
+                    "operation": label,
+                    "count": len(ordered),
+                    "total_s": sum(ordered),
+                    "p50_ms": ordered[len(ordered) // 2] * 1000,
+                    "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                    "max_ms": ordered[-1] * 1000,
+                    "statuses": statuses,
+                    "bytes_sent": self.bytes_sent.get(label, 0),
+                    "bytes_received": self.bytes_received.get(label, 0),
+                    "retries": self.retries.get(label, 0),
+                }
+
+    def print_summary(self):
+        rows = list(self.rows())
+        if not rows:
+            return
+        print(f"\n{'operation':<48} {'n':>6} {'total s':>8} {'p50 ms':>8} {'p95 ms':>8} {'retries':>7} {'KB in':>8}  statuses")
+        for row in rows:
+            statuses = " ".join(f"{status}:{count}" for status, count in sorted(row["statuses"].items()))
+            print(
+                f"{row['operation']:<48} {row['count']:>6} {row['total_s']:>8.2f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['retries']:>7} "
+                f"{row['bytes_received'] / 1024:>8.1f}  {statuses}"
+            )
+
+    def write(self, path):
+        # .prom writes Prometheus text format, anything else JSON lines
+        rows = list(self.rows())
+        with open(path, "w") as f:
+            if path.endswith(".prom"):
+                f.write(self._prometheus(rows))
+            else:
+                for row in rows:
+                    f.write(json.dumps(dict(row, run_started_at=self.started_at)) + "\n")
+
+    @staticmethod
+    def _prometheus(rows):
+        lines = []
+        for row in rows:
+            op = row["operation"].replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'populate_operation_seconds_sum{{operation="{op}"}} {row["total_s"]}')
+            lines.append(f'populate_operation_seconds_count{{operation="{op}"}} {row["count"]}')
+            lines.append(f'populate_operation_retries_total{{operation="{op}"}} {row["retries"]}')
+            lines.append(f'populate_operation_bytes_sent_total{{operation="{op}"}} {row["bytes_sent"]}')
+            lines.append(f'populate_operation_bytes_received_total{{operation="{op}"}} {row["bytes_received"]}')
+            for status, count in row["statuses"].items():
+                lines.append(
+                    f'populate_operation_status_total{{operation="{op}",status="{status}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    def __init__(self, metrics, label):
+        self.metrics = metrics
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.label, time.perf_counter() - self.start)
+
+
+def mongo_listener(metrics):
+    # Builds a CommandListener that times every command the client sends;
+    # register with MongoClient(..., event_listeners=[mongo_listener(metrics)]).
+    # pymongo is imported here so Metrics itself stays cheap to import.
+    from pymongo import monitoring
+
+    class MongoMetricsListener(monitoring.CommandListener):
+        def __init__(self, metrics):
+            self.metrics = metrics
+            self.collections = {}
+            self.lock = threading.Lock()
+
+        def started(self, event):
+            collection = event.command.get(event.command_name)
+            with self.lock:
+                self.collections[event.request_id] = (
+                    collection if isinstance(collection, str) else event.database_name
+                )
+
+        def _finish(self, event, ok):
+            with self.lock:
+                collection = self.collections.pop(event.request_id, event.database_name)
+            self.metrics.record_mongo(
+                f"mongo {event.command_name} {collection}",
+                event.duration_micros / 1e6,
+                ok=ok,
+            )
+
+        def succeeded(self, event):
+            self._finish(event, True)
+
+        def failed(self, event):
+            self._finish(event, False)
+
+    return MongoMetricsListener(metrics)
+
+
+class profiling:
+    # Opt-in profiler around a block: mode "cpu" runs cProfile and dumps
+    # stats to `path`, "memory" runs tracemalloc. Prints the top entries.
+    # Before Python 3.12 cProfile only sees the thread that enabled it, so
+    # every thread started inside the block gets its own profiler and all
+    # of them are merged into the one stats file.
+    def __init__(self, mode, path, top=20):
+        self.mode = mode
+        self.path = path
+        self.top = top
+        self.thread_profilers = []
+        self.lock = threading.Lock()
+
+    def _profile_thread(self, *args):
+        # Threading's profile hook runs once in each new thread; this hands
+        # the thread over to a profiler of its own
+        import cProfile
+
+        profiler = cProfile.Profile()
+        with self.lock:
+            self.thread_profilers.append(profiler)
+        profiler.enable()
+
+    def __enter__(self):
+        if self.mode == "cpu":
+            import cProfile
+            import sys
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            if sys.version_info < (3, 12):
+                threading.setprofile(self._profile_thread)
+        elif self.mode == "memory":
+            import tracemalloc
+
+            tracemalloc.start()
+        elif self.mode:
+            raise ValueError(f"Unknown profiling mode: {self.mode}")
+        return self
+
+    def __exit__(self, *exc):
+        if self.mode == "cpu":
+            import pstats
+
+            threading.setprofile(None)
+            self.profiler.disable()
+            stats = pstats.Stats(self.profiler)
+            with self.lock:
+                for profiler in self.thread_profilers:
+                    profiler.disable()
+                    stats.add(profiler)
+            stats.dump_stats(self.path)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            print(f"cProfile stats written to {self.path}")
+        elif self.mode == "memory":
+            import tracemalloc
+
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"\nMemory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+            for stat in snapshot.statistics("lineno")[: self.top]:
+                print(stat)
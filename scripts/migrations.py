@@ -0,0 +1,51 @@
+from pymongo import UpdateOne
+
+
+def migrate_documents(
+    collection, transform, filter=None, projection=None, batch_size=1000, dry_run=False
+):
+    # Streams matching documents (only the projected fields) and applies the
+    # update returned by transform(doc) in unordered bulk_write batches.
+    # transform returns an update document, or None to leave the doc alone.
+    scanned = changed = modified = 0
+    ops = []
+
+    def flush():
+        nonlocal modified, ops
+        if ops:
+            modified += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+
+    for document in collection.find(filter or {}, projection, batch_size=batch_size):
+        scanned += 1
+        update = transform(document)
+        if update is None:
+            continue
+        changed += 1
+        if dry_run:
+            continue
+        ops.append(UpdateOne({"_id": document["_id"]}, update))
+        if len(ops) >= batch_size:
+            flush()
+    flush()
+
+    if dry_run:
+        print(f"[dry run] {collection.name}: {changed} of {scanned} documents would change")
+    else:
+        print(f"{collection.name}: scanned {scanned}, changed {changed}, modified {modified}")
+    return changed if dry_run else modified
+
+
+def migrate_server_side(collection, filter, pipeline, dry_run=False):
+    # Runs the transform inside the server as an aggregation-pipeline update,
+    # so no documents travel over the wire at all.
+    if dry_run:
+        count = collection.count_documents(filter)
+        print(f"[dry run] {collection.name}: {count} documents would change")
+        return count
+
+    result = collection.update_many(filter, pipeline)
+    print(
+        f"{collection.name}: matched {result.matched_count}, modified {result.modified_count}"
+    )
+    return result.modified_count
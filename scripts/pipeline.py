@@ -0,0 +1,68 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, fn, workers=1):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+
+def run_pipeline(source, stages, maxsize=64):
+    # Stages are connected by bounded queues, so an item moves downstream as
+    # soon as it is ready and a slow stage applies backpressure upstream.
+    # A stage function returns the item for the next stage, or None to drop it.
+    # Yields the outputs of the last stage as they complete.
+    queues = [queue.Queue(maxsize) for _ in range(len(stages) + 1)]
+
+    def feed():
+        for item in source:
+            queues[0].put(item)
+        for _ in range(stages[0].workers):
+            queues[0].put(_DONE)
+
+    def work(i, remaining, lock):
+        stage = stages[i]
+        inbox, outbox = queues[i], queues[i + 1]
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            try:
+                result = stage.fn(item)
+            except Exception as e:
+                print(f"Stage {stage.name} failed: {e!r}")
+                continue
+            if result is not None:
+                outbox.put(result)
+
+        # The last worker of a stage to finish closes the next stage
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            downstream = stages[i + 1].workers if i + 1 < len(stages) else 1
+            for _ in range(downstream):
+                outbox.put(_DONE)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    for i, stage in enumerate(stages):
+        remaining, lock = [stage.workers], threading.Lock()
+        threads += [
+            threading.Thread(target=work, args=(i, remaining, lock), daemon=True)
+            for _ in range(stage.workers)
+        ]
+    for thread in threads:
+        thread.start()
+
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        yield item
+
+    for thread in threads:
+        thread.join()
@@ -0,0 +1,116 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+# ObjectIds are handled as their 12 raw bytes so numpy can sort and match them
+OBJECT_ID = "S12"
+BATCH_SIZE = 10000
+
+
+def object_ids(values):
+    return np.frombuffer(b"".join(value.binary for value in values), dtype=OBJECT_ID)
+
+
+def lookup(keys, values, wanted, default=0):
+    # values[i] belongs to keys[i]; returns the value for each wanted key
+    if not len(keys):
+        return np.full(len(wanted), default, dtype=float)
+    order = np.argsort(keys)
+    keys, values = keys[order], values[order]
+    positions = np.clip(np.searchsorted(keys, wanted), 0, len(keys) - 1)
+    return np.where(keys[positions] == wanted, values[positions], default)
+
+
+def compute_totals(db, event_id, batch_size=BATCH_SIZE):
+    """
+    Returns (user ids, point totals) for every user with a check-in to the
+    event, summing the points of each check-in's item like getPointsPipeline
+    in src/aggregations/checkin.ts. Check-ins to deleted items count 0.
+    """
+    items = list(db["checkin-items"].find({}, {"points": 1}, batch_size=batch_size))
+    item_ids = object_ids(item["_id"] for item in items)
+    item_points = np.array([item.get("points") or 0 for item in items], dtype=float)
+
+    # Raw id bytes accumulate as the cursor streams; no per-check-in objects
+    users = bytearray()
+    checked_in = bytearray()
+    for checkin in db["checkins"].find(
+        {"event": event_id}, {"user": 1, "item": 1, "_id": 0}, batch_size=batch_size
+    ):
+        users += checkin["user"].binary
+        checked_in += checkin["item"].binary
+    if not users:
+        return np.empty(0, dtype=OBJECT_ID), np.empty(0)
+
+    points = lookup(item_ids, item_points, np.frombuffer(bytes(checked_in), dtype=OBJECT_ID))
+    user_ids, inverse = np.unique(
+        np.frombuffer(bytes(users), dtype=OBJECT_ID), return_inverse=True
+    )
+    return user_ids, np.bincount(inverse, weights=points, minlength=len(user_ids))
+
+
+def find_drift(db, event_id, batch_size=BATCH_SIZE):
+    # Profiles of the event whose stored totalPoints differ from their
+    # check-ins; profiles without check-ins should be at 0
+    user_ids, totals = compute_totals(db, event_id, batch_size)
+
+    profiles = list(
+        db["profiles"].find(
+            {"event": event_id}, {"user": 1, "totalPoints": 1}, batch_size=batch_size
+        )
+    )
+    if not profiles:
+        return []
+    stored = np.array([profile.get("totalPoints") or 0 for profile in profiles], dtype=float)
+    expected = lookup(user_ids, totals, object_ids(profile["user"] for profile in profiles))
+    drifted = np.flatnonzero(stored != expected)
+    return [(profiles[i]["_id"], stored[i], expected[i]) for i in drifted]
+
+
+def as_number(value):
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def verify_points(db, event_id, dry_run=False, batch_size=BATCH_SIZE):
+    from pymongo import UpdateOne
+
+    started = time.perf_counter()
+    drift = find_drift(db, event_id, batch_size)
+    computed = time.perf_counter() - started
+
+    if drift and not dry_run:
+        db["profiles"].bulk_write(
+            [
+                UpdateOne({"_id": _id}, {"$set": {"totalPoints": as_number(expected)}})
+                for _id, _, expected in drift
+            ],
+            ordered=False,
+        )
+    action = "would fix" if dry_run else "fixed"
+    print(
+        f"{len(drift)} profiles drifted ({action}); computed in {computed:.2f}s, "
+        f"{time.perf_counter() - started:.2f}s total"
+    )
+    return drift
+
+
+if __name__ == "__main__":
+    import pymongo
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Verify and repair profile totalPoints")
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="tartanhacks-25-dev")
+    parser.add_argument("--dry-run", action="store_true", help="report drift without writing")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = pymongo.MongoClient(args.uri)[args.db]
+    event = db["events"].find_one({"name": "TartanHacks"}, {"_id": 1})
+    if event is None:
+        raise SystemExit(f"No TartanHacks event in {args.db}")
+    for _id, stored, expected in verify_points(db, event["_id"], args.dry_run, args.batch_size):
+        print(f"{_id}: {as_number(stored)} -> {as_number(expected)}")
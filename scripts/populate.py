@@ -1,9 +1,21 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
 import csv
+import functools
 import os
-import requests
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from dotenv import load_dotenv
-import pymongo
-from bson import ObjectId
+
+from pipeline import Stage, run_pipeline
+
+# Heavy dependencies (pymongo, requests) and the Mongo/HTTP clients are only
+# loaded by the commands that need them; see the get_* accessors below
 
 load_dotenv()
 
@@ -13,63 +25,213 @@ JWT_SECRET = os.getenv("JWT_SECRET")
 MONGO_CONNECTION_STRING = os.getenv("MONGODB_URI")
 HELIX_DB = "tartanhacks-25-dev"
 JUDGING_DB = "tartanhacks-25-judging-dev"
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 32))
+# Print full response bodies for every call, not just failures
+VERBOSE = os.getenv("POPULATE_VERBOSE") == "1"
+# Metrics are written here at the end of a run; use a .prom suffix for
+# Prometheus text format instead of JSON lines
+METRICS_FILE = os.getenv("POPULATE_METRICS_FILE", "../data/metrics.jsonl")
+# "cpu" for cProfile or "memory" for tracemalloc
+PROFILE = os.getenv("POPULATE_PROFILE")
+# Adapt in-flight API requests to what the backend sustains (up to
+# API_POOL_SIZE); set to 0 to run exactly --workers requests at a time
+ADAPTIVE = os.getenv("POPULATE_ADAPTIVE", "1") != "0"
+CONCURRENCY_TRACE_FILE = os.getenv("POPULATE_CONCURRENCY_TRACE", "../data/concurrency.csv")
+# Default --workers for bulk commands; with ADAPTIVE the governor decides
+# how many of them actually have a request in flight
+DEFAULT_WORKERS = API_POOL_SIZE if ADAPTIVE else 16
+
+_lazy = {}
+_lazy_lock = threading.RLock()
+
+
+def lazy(factory):
+    # Builds the value on first call and returns the cached one afterwards
+    @functools.wraps(factory)
+    def get():
+        if factory.__name__ not in _lazy:
+            with _lazy_lock:
+                if factory.__name__ not in _lazy:
+                    _lazy[factory.__name__] = factory()
+        return _lazy[factory.__name__]
+
+    return get
+
+
+@lazy
+def get_metrics():
+    from metrics import Metrics
+
+    return Metrics()
+
+
+@lazy
+def get_client():
+    import pymongo
+
+    from metrics import mongo_listener
+
+    print(f"HELIX_DB: {HELIX_DB}")
+    print(f"JUDGING_DB: {JUDGING_DB}")
+    return pymongo.MongoClient(
+        MONGO_CONNECTION_STRING,
+        tlsAllowInvalidCertificates=True,
+        event_listeners=[mongo_listener(get_metrics())],
+    )
 
-print(f"MONGO_CONNECTION_STRING: {MONGO_CONNECTION_STRING}")
-print(f"HELIX_DB: {HELIX_DB}")
-print(f"JUDGING_DB: {JUDGING_DB}")
-
-client = pymongo.MongoClient(MONGO_CONNECTION_STRING, tlsAllowInvalidCertificates=True)
-helix_db = client[HELIX_DB]
-# judging_db = client[JUDGING_DB]
-
-# Check if directory exists
-if not os.path.exists("../data"):
-    os.makedirs("../data")
-
-
-def create_users(n):
-    with open("../data/users.csv", mode="w", newline="") as file:
-        fieldnames = [
-            "admin",
-            "judge",
-            "company",
-            "status",
-            "_id",
-            "email",
-            "createdAt",
-            "updatedAt",
-            "__v",
-            "password",
-            "token",
-        ]
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
+
+@lazy
+def get_helix_db():
+    return get_client()[HELIX_DB]
+
+
+@lazy
+def get_governor():
+    from api_client import Governor
+
+    return Governor(maximum=API_POOL_SIZE)
+
+
+# Shared keep-alive clients; every HTTP call below goes through these pools
+@lazy
+def get_api():
+    from api_client import ApiClient
+
+    return ApiClient(
+        API_URL,
+        token=JWT_SECRET,
+        pool_size=API_POOL_SIZE,
+        metrics=get_metrics(),
+        governor=get_governor() if ADAPTIVE else None,
+    )
+
+
+@lazy
+def get_judging_api():
+    from api_client import ApiClient
+
+    return ApiClient(JUDGING_URL, pool_size=API_POOL_SIZE, metrics=get_metrics())
+
+
+def get_event_id():
+    # Same lookup as getTartanHacks in src/controllers/EventController.ts
+    event = get_helix_db()["events"].find_one({"name": "TartanHacks"}, {"_id": 1})
+    if event is None:
+        raise SystemExit(f"No TartanHacks event in {HELIX_DB}")
+    return event["_id"]
+
+
+def ensure_data_dir():
+    # Check if directory exists
+    if not os.path.exists("../data"):
+        os.makedirs("../data")
+
+
+def log_response(label, response):
+    if VERBOSE or response.status_code >= 400:
+        print(f"Response for {label}: {response.status_code} - {response.text[:500]}")
+    else:
+        print(f"Response for {label}: {response.status_code}")
+
+
+USER_FIELDNAMES = [
+    "admin",
+    "judge",
+    "company",
+    "status",
+    "_id",
+    "email",
+    "createdAt",
+    "updatedAt",
+    "__v",
+    "password",
+    "token",
+]
+
+def create_test_account(status="CONFIRMED"):
+    return get_api().post(f"/test-account?status={status}")
+
+
+def user_row(user_data):
+    return {
+        "admin": user_data.get("admin", False),
+        "judge": user_data.get("judge", False),
+        "company": user_data.get("company", None),
+        "status": user_data.get("status", "CONFIRMED"),
+        "_id": user_data.get("_id"),
+        "email": user_data.get("email"),
+        "createdAt": user_data.get("createdAt"),
+        "updatedAt": user_data.get("updatedAt"),
+        "__v": user_data.get("__v", 0),
+        "password": user_data.get("password"),
+        "token": user_data.get("token"),
+    }
+
+
+def create_users(n, workers=1, ordered=False):
+    # workers > 1 creates accounts concurrently. With ordered=True rows are
+    # written in submission order, otherwise as soon as each account is created.
+    with open("../data/users.csv", mode="w", newline="") as file, ThreadPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        writer = csv.DictWriter(file, fieldnames=USER_FIELDNAMES)
         writer.writeheader()
 
-        for i in range(n):
-            response = requests.post(
-                f"{API_URL}/test-account?status=CONFIRMED",
-                headers={"x-access-token": JWT_SECRET},
-            )
+        futures = [executor.submit(create_test_account) for _ in range(n)]
+        for future in futures if ordered else as_completed(futures):
+            response = future.result()
 
             if response.status_code == 200:
-                user_data = response.json()
-                writer.writerow(
-                    {
-                        "admin": user_data.get("admin", False),
-                        "judge": user_data.get("judge", False),
-                        "company": user_data.get("company", None),
-                        "status": user_data.get("status", "CONFIRMED"),
-                        "_id": user_data.get("_id"),
-                        "email": user_data.get("email"),
-                        "createdAt": user_data.get("createdAt"),
-                        "updatedAt": user_data.get("updatedAt"),
-                        "__v": user_data.get("__v", 0),
-                        "password": user_data.get("password"),
-                        "token": user_data.get("token"),
-                    }
-                )
+                writer.writerow(user_row(response.json()))
+
+            log_response("user", response)
+
+
+TEAM_FIELDNAMES = ["_id", "name", "description", "visible", "user_email"]
 
-            print(f"Response for user {response.status_code} - {response.text}")
+
+class CsvSink:
+    # Thread-safe CSV writer for side outputs of concurrent stages
+    def __init__(self, path, fieldnames):
+        self.file = open(path, mode="w", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames)
+        self.writer.writeheader()
+        self.lock = threading.Lock()
+
+    def write(self, row):
+        with self.lock:
+            self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+def team_payload(user):
+    return {
+        "name": f"Team {user['email']}",
+        "description": "A team created by the script",
+        "visible": True,
+    }
+
+
+def create_team(user):
+    team_response = get_api().post(
+        "/team/",
+        json=team_payload(user),
+        headers={"x-access-token": user["token"]},
+    )
+    log_response("team creation", team_response)
+
+    if team_response.status_code != 200:
+        return None
+    team_data = team_response.json()
+    return {
+        "_id": team_data["_id"],
+        "name": team_data["name"],
+        "description": team_data["description"],
+        "visible": team_data["visible"],
+        "user_email": user["email"],
+    }
 
 
 def create_teams():
@@ -77,91 +239,128 @@ def create_teams():
         "../data/teams.csv", mode="w", newline=""
     ) as teams_file:
         csv_reader = csv.DictReader(users_file)
-        fieldnames = ["_id", "name", "description", "visible", "user_email"]
-        writer = csv.DictWriter(teams_file, fieldnames=fieldnames)
+        writer = csv.DictWriter(teams_file, fieldnames=TEAM_FIELDNAMES)
         writer.writeheader()
 
         for row in csv_reader:
-            team_data = {
-                "name": f"Team {row['email']}",
-                "description": "A team created by the script",
-                "visible": True,
-            }
-            team_response = requests.post(
-                f"{API_URL}/team/",
-                json=team_data,
-                headers={"x-access-token": row["token"]},
-            )
+            team = create_team(row)
+            if team is not None:
+                writer.writerow(team)
 
-            if team_response.status_code == 200:
-                team_data = team_response.json()
-                writer.writerow(
-                    {
-                        "_id": team_data["_id"],
-                        "name": team_data["name"],
-                        "description": team_data["description"],
-                        "visible": team_data["visible"],
-                        "user_email": row["email"],
-                    }
-                )
 
-            print(
-                f"Response for team creation: {team_response.status_code} - {team_response.text}"
-            )
+def project_payload(team):
+    return {
+        "name": f"Project for {team['name']}",
+        "description": "A project created by the script",
+        "team": team["_id"],
+        "slides": "http://example.com/slides",
+        "video": "http://example.com/video",
+        "url": "http://example.com",
+        "presentingVirtually": False,
+    }
 
 
-def create_projects(n):
-    create_users(n)
-    create_teams()
+def table_number_payload(table_number):
+    return {"tableNumber": str(table_number)}
 
-    with open("../data/teams.csv", mode="r") as teams_file:
-        csv_reader = csv.DictReader(teams_file)
-        for row in csv_reader:
-            project_data = {
-                "name": f"Project for {row['name']}",
-                "description": "A project created by the script",
-                "team": row["_id"],
-                "slides": "http://example.com/slides",
-                "video": "http://example.com/video",
-                "url": "http://example.com",
-                "presentingVirtually": True,
-            }
-            project_response = requests.post(
-                f"{API_URL}/projects",
-                json=project_data,
-                headers={"x-access-token": JWT_SECRET},
-            )
 
-            table_number_response = requests.patch(
-                f"{API_URL}/projects/{project_response.json()['_id']}/table-number",
-                json={"tableNumber": 1},
-                headers={"x-access-token": JWT_SECRET},
-            )
+def create_project(team, table_number=1):
+    project_response = get_api().post("/projects", json=project_payload(team))
+    log_response("project creation", project_response)
+    if project_response.status_code != 200:
+        return None
+    project = project_response.json()
 
-            print(
-                f"Response for project creation: {project_response.status_code} - {project_response.text}"
-            )
-            print(
-                f"Response for table number assignment: {table_number_response.status_code} - {table_number_response.text}"
-            )
+    table_number_response = get_api().patch(
+        f"/projects/{project['_id']}/table-number",
+        json=table_number_payload(table_number),
+    )
+    log_response("table number assignment", table_number_response)
+    return project
+
+
+def next_free_table():
+    # One past the highest numeric table any project already holds. The
+    # PATCH endpoint refuses to move a project's table once it is set, so a
+    # clash could not be repaired afterwards.
+    from list_reader import iter_list
+
+    highest = 0
+    for project in iter_list(get_api(), "/projects"):
+        table = str(project.get("tableNumber") or "")
+        if table.isdigit():
+            highest = max(highest, int(table))
+    return highest + 1
+
+
+def create_projects(
+    n, user_workers=8, team_workers=8, project_workers=8, write_csv=True
+):
+    # Streams each new user straight into team and project creation instead
+    # of finishing every user before the first team starts. users.csv and
+    # teams.csv are still written as side outputs when write_csv is set.
+    users_sink = CsvSink("../data/users.csv", USER_FIELDNAMES) if write_csv else None
+    teams_sink = CsvSink("../data/teams.csv", TEAM_FIELDNAMES) if write_csv else None
+    # Seeded projects sit at consecutive free tables in the order they finish
+    first_table = next_free_table()
+    tables = iter(range(first_table, first_table + n))
+    tables_lock = threading.Lock()
+
+    def user_stage(_):
+        response = create_test_account()
+        log_response("user", response)
+        if response.status_code != 200:
+            return None
+        user = user_row(response.json())
+        if users_sink:
+            users_sink.write(user)
+        return user
+
+    def team_stage(user):
+        team = create_team(user)
+        if team is not None and teams_sink:
+            teams_sink.write(team)
+        return team
+
+    def project_stage(team):
+        with tables_lock:
+            table_number = next(tables)
+        return create_project(team, table_number)
+
+    stages = [
+        Stage("users", user_stage, user_workers),
+        Stage("teams", team_stage, team_workers),
+        Stage("projects", project_stage, project_workers),
+    ]
+    try:
+        projects = list(run_pipeline(range(n), stages))
+    finally:
+        for sink in (users_sink, teams_sink):
+            if sink:
+                sink.close()
+    print(f"Created {len(projects)} of {n} projects")
+
+
+def assign_tables(bulk=False, workers=16, dry_run=False):
+    # Opt-in: groups the current event's projects entering the same prizes at
+    # neighbouring tables. Reads HELIX_DB; bulk=True also writes to it and
+    # may reassign tables.
+    from tables import allocate_tables
+
+    return allocate_tables(
+        get_helix_db(),
+        get_event_id(),
+        api=None if bulk else get_api(),
+        bulk=bulk,
+        workers=workers,
+        dry_run=dry_run,
+    )
 
 
-def delete_projects():
-    # Get projects
-    projects_response = requests.get(
-        f"{API_URL}/projects", headers={"x-access-token": JWT_SECRET}
-    )
-    projects = projects_response.json()
+def delete_projects(workers=16):
+    import teardown
 
-    # Delete projects
-    for project in projects:
-        project_id = project["_id"]
-        project_response = requests.delete(
-            f"{API_URL}/projects/{project_id}", headers={"x-access-token": JWT_SECRET}
-        )
-        print(
-            f"Response for project deletion: {project_response.status_code} - {project_response.text}"
-        )
+    return teardown.delete_projects(get_api(), workers=workers)
 
 
 def create_judges(n):
@@ -174,9 +373,7 @@ def create_judges(n):
             if row["email"]:
                 judges.append(row["email"])
 
-        judge_response = requests.post(
-            f"{API_URL}/judges/", json=judges, headers={"x-access-token": JWT_SECRET}
-        )
+        judge_response = get_api().post("/judges/", json=judges)
 
         # Copy users file to judges file using os but only the email and passwords by opening the csv and copying
         with open("../data/users.csv", mode="r") as users_file, open(
@@ -190,36 +387,69 @@ def create_judges(n):
             for row in csv_reader:
                 writer.writerow({"email": row["email"], "password": row["password"]})
 
-        print(
-            f"Response for judge creation: {judge_response.status_code} - {judge_response.text}"
-        )
+        log_response("judge creation", judge_response)
 
 
 def delete_judging_database():
-    client.drop_database(JUDGING_DB)
+    get_client().drop_database(JUDGING_DB)
 
 
 def synchronize():
-    response = requests.get(f"{JUDGING_URL}/api/synchronize")
-    print(f"Response for synchronization: {response.status_code} - {response.text}")
+    response = get_judging_api().get("/api/synchronize")
+    log_response("synchronization", response)
+
+
+def sponsor_payload(row):
+    return {
+        "name": row["name"],
+    }
+
+
+def talk_payload(row):
+    return {
+        "name": row["name"],
+        "description": row["description"],
+        "startTime": int(row["startTime"]),
+        "endTime": int(row["endTime"]),
+        "points": int(row["points"]),
+        "accessLevel": row["accessLevel"],
+        "enableSelfCheckIn": row["enableSelfCheckIn"],
+    }
+
+
+def prize_payload(row):
+    prize_data = {
+        "name": row["name"],
+        "description": row["description"],
+        "eligibility": row["eligibility"],
+        "sponsorName": row["sponsorName"],
+    }
+    if "requiredTalk" in row:
+        prize_data["requiredTalk"] = row["requiredTalk"]
+    return prize_data
+
+
+def schedule_payload(row):
+    return {
+        "name": row["name"],
+        "description": row["description"],
+        "startTime": int(row["startTime"]),
+        "endTime": int(row["endTime"]),
+        "location": row["location"],
+        "lat": 0,
+        "lng": 0,
+        "platform": "IN_PERSON",
+        "platformUrl": "",
+    }
 
 
 def create_sponsors():
     with open("../data/sponsors.csv", mode="r") as sponsors_file:
         csv_reader = csv.DictReader(sponsors_file)
         for row in csv_reader:
-            sponsor_data = {
-                "name": row["name"],
-            }
-            sponsor_response = requests.post(
-                f"{API_URL}/sponsor",
-                json=sponsor_data,
-                headers={"x-access-token": JWT_SECRET},
-            )
+            sponsor_response = get_api().post("/sponsor", json=sponsor_payload(row))
 
-            print(
-                f"Response for sponsor creation: {sponsor_response.status_code} - {sponsor_response.text}"
-            )
+            log_response("sponsor creation", sponsor_response)
 
 
 def create_talks():
@@ -227,222 +457,495 @@ def create_talks():
     with open("../data/talks.csv", mode="r") as file:
         csv_reader = csv.DictReader(file)
         for row in csv_reader:
-            check_in_data = {
-                "name": row["name"],
-                "description": row["description"],
-                "startTime": int(row["startTime"]),
-                "endTime": int(row["endTime"]),
-                "points": int(row["points"]),
-                "accessLevel": row["accessLevel"],
-                "enableSelfCheckIn": row["enableSelfCheckIn"],
-            }
-            response = requests.post(
-                f"{API_URL}/check-in",
-                json=check_in_data,
-                headers={"x-access-token": JWT_SECRET},
-            )
-            print(
-                f"Response for check-in creation: {response.status_code} - {response.text}"
-            )
+            response = get_api().post("/check-in", json=talk_payload(row))
+            log_response("check-in creation", response)
 
 
 def create_prizes():
     with open("../data/prizes.csv", mode="r") as prizes_file:
         csv_reader = csv.DictReader(prizes_file)
         for row in csv_reader:
-            prize_data = {
-                "name": row["name"],
-                "description": row["description"],
-                "eligibility": row["eligibility"],
-                "sponsorName": row["sponsorName"],
-            }
-            if "requiredTalk" in row:
-                prize_data["requiredTalk"] = row["requiredTalk"]
-            prize_response = requests.post(
-                f"{API_URL}/prizes",
-                json=prize_data,
-                headers={"x-access-token": JWT_SECRET},
-            )
+            prize_response = get_api().post("/prizes", json=prize_payload(row))
 
-            print(
-                f"Response for prize creation: {prize_response.status_code} - {prize_response.text}"
-            )
+            log_response("prize creation", prize_response)
 
 
-def delete_prizes():
-    # Get prizes
-    prizes_response = requests.get(
-        f"{API_URL}/prizes", headers={"x-access-token": JWT_SECRET}
-    )
-    prizes = prizes_response.json()
+def delete_prizes(workers=16):
+    import teardown
 
-    # Delete prizes
-    for prize in prizes:
-        prize_id = prize["_id"]
-        prize_response = requests.delete(
-            f"{API_URL}/prizes/{prize_id}", headers={"x-access-token": JWT_SECRET}
-        )
-        print(
-            f"Response for prize deletion: {prize_response.status_code} - {prize_response.text}"
-        )
+    return teardown.delete_prizes(get_api(), workers=workers)
 
 
 def submit_to_prize(project_id, prize_id):
-    url = f"{API_URL}/projects/prizes/enter/{project_id}"
-    headers = {"x-access-token": JWT_SECRET}
     params = {"prizeID": prize_id}
-    response = requests.put(url, headers=headers, params=params)
-    print(
-        f"Response for submitting project to prize: {response.status_code} - {response.text}"
-    )
+    response = get_api().put(f"/projects/prizes/enter/{project_id}", params=params)
+    log_response("submitting project to prize", response)
+
+
+def delete_talks(workers=16):
+    import teardown
+
+    return teardown.delete_check_in_items(get_api(), workers=workers)
 
 
-# def delete_talks():
-#     helix_db.drop_collection("checkin-items")
-#
 # def delete_checkins():
 #     helix_db.drop_collection("checkins")
 
 
 def check_in_user(user_id, check_in_item_id):
-    url = f"{API_URL}/check-in/user"
-    headers = {"x-access-token": JWT_SECRET}
     params = {"userID": user_id, "checkInItemID": check_in_item_id}
-    response = requests.put(url, headers=headers, params=params)
-    print(f"Response for checking in user: {response.status_code} - {response.text}")
+    response = get_api().put("/check-in/user", params=params)
+    log_response("checking in user", response)
+    return response
+
+
+# Cached name -> _id lookups; repeated lookups of the same name hit memory
+@lazy
+def get_resolvers():
+    from resolver import Resolver
+
+    helix_db = get_helix_db()
+    return {
+        "users": Resolver(helix_db["users"], "email"),
+        "checkin-items": Resolver(helix_db["checkin-items"], "name"),
+        "projects": Resolver(helix_db["projects"], "name"),
+        "prizes": Resolver(helix_db["prizes"], "name"),
+    }
+
+
+def warm_resolvers():
+    # One projected find per collection, for scripts that touch many entities
+    for resolver in get_resolvers().values():
+        resolver.warm()
 
 
 def get_user_id(email):
-    user = helix_db.users.find_one({"email": email})
-    if user is None:
-        return None
-    return user["_id"]
+    return get_resolvers()["users"].resolve(email)
+
 
 def get_check_in_item_id(name):
-    check_in_item = helix_db["checkin-items"].find_one({"name": name})
-    if check_in_item is None:
-        return None
-    return check_in_item["_id"]
+    return get_resolvers()["checkin-items"].resolve(name)
 
 
 def get_project_id(name):
-    project = helix_db.projects.find_one({"name": name})
-    if project is None:
-        return None
-    return project["_id"]
+    return get_resolvers()["projects"].resolve(name)
 
 
 def get_prize_id(name):
-    prize = helix_db.prizes.find_one({"name": name})
-    if prize is None:
-        return None
-    return prize["_id"]
+    return get_resolvers()["prizes"].resolve(name)
+
+
+def bulk_check_in(
+    roster_path="../data/checkins.csv",
+    report_path="../data/checkins_report.csv",
+    workers=16,
+    rate=20,
+):
+    # Roster columns: email, item (check-in item name). Users and items are
+    # resolved with one $in query each, pairs that are already checked in are
+    # skipped, and the rest are sent concurrently at no more than `rate`/s.
+    import requests
+
+    from api_client import RateLimiter
+
+    with open(roster_path, mode="r") as roster_file:
+        roster = [
+            (row["email"].strip(), row["item"].strip())
+            for row in csv.DictReader(roster_file)
+        ]
+
+    users = get_resolvers()["users"].resolve_many(email for email, _ in roster)
+    items = get_resolvers()["checkin-items"].resolve_many(item for _, item in roster)
+
+    existing = {
+        (checkin["user"], checkin["item"])
+        for checkin in get_helix_db()["checkins"].find(
+            {
+                "user": {"$in": [_id for _id in users.values() if _id]},
+                "item": {"$in": [_id for _id in items.values() if _id]},
+            },
+            {"user": 1, "item": 1, "_id": 0},
+        )
+    }
+
+    report = []
+    pending = []
+    seen = set()
+    for email, item in roster:
+        user_id, item_id = users[email], items[item]
+        if user_id is None:
+            report.append((email, item, "unknown user", ""))
+        elif item_id is None:
+            report.append((email, item, "unknown check-in item", ""))
+        elif (user_id, item_id) in existing or (user_id, item_id) in seen:
+            report.append((email, item, "already checked in", ""))
+        else:
+            seen.add((user_id, item_id))
+            pending.append((email, item, user_id, item_id))
+
+    limiter = RateLimiter(rate)
+
+    def send(entry):
+        email, item, user_id, item_id = entry
+        limiter.wait()
+        try:
+            response = check_in_user(str(user_id), str(item_id))
+        except requests.RequestException as e:
+            return email, item, "failed", repr(e)
+        status = "checked in" if response.status_code == 200 else "failed"
+        return email, item, status, response.status_code
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        report += executor.map(send, pending)
+
+    with open(report_path, mode="w", newline="") as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(["email", "item", "result", "detail"])
+        writer.writerows(report)
+
+    checked_in = sum(1 for row in report if row[2] == "checked in")
+    print(f"Checked in {checked_in} of {len(roster)} roster rows, see {report_path}")
+
+
+def bulk_submit(
+    roster_path="../data/submissions.csv",
+    report_path="../data/submissions_report.csv",
+    workers=16,
+):
+    # Roster columns: project, prize (names). Pairs the server would reject
+    # for a missing required talk check-in are filtered out locally and
+    # reported; the rest are submitted concurrently.
+    import requests
+
+    from eligibility import EligibilityIndex
+
+    with open(roster_path, mode="r") as roster_file:
+        roster = [
+            (row["project"].strip(), row["prize"].strip())
+            for row in csv.DictReader(roster_file)
+        ]
+
+    projects = get_resolvers()["projects"].resolve_many(project for project, _ in roster)
+    prizes = get_resolvers()["prizes"].resolve_many(prize for _, prize in roster)
+    index = EligibilityIndex(
+        get_helix_db(),
+        {_id for _id in projects.values() if _id},
+        {_id for _id in prizes.values() if _id},
+    )
+
+    report = []
+    pending = []
+    seen = set()
+    for project, prize in roster:
+        project_id, prize_id = projects[project], prizes[prize]
+        if project_id is None:
+            reason = "unknown project"
+        elif prize_id is None:
+            reason = "unknown prize"
+        elif (project_id, prize_id) in seen:
+            reason = "duplicate roster row"
+        else:
+            reason = index.check(project_id, prize_id)
+        if reason:
+            report.append((project, prize, "rejected", reason))
+        else:
+            seen.add((project_id, prize_id))
+            pending.append((project, prize, project_id, prize_id))
+
+    def send(entry):
+        project, prize, project_id, prize_id = entry
+        try:
+            response = get_api().put(
+                f"/projects/prizes/enter/{project_id}", params={"prizeID": str(prize_id)}
+            )
+        except requests.RequestException as e:
+            return project, prize, "failed", repr(e)
+        log_response("submitting project to prize", response)
+        status = "submitted" if response.status_code == 200 else "failed"
+        return project, prize, status, response.status_code
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        report += executor.map(send, pending)
+
+    with open(report_path, mode="w", newline="") as report_file:
+        writer = csv.writer(report_file)
+        writer.writerow(["project", "prize", "result", "detail"])
+        writer.writerows(report)
+
+    submitted = sum(1 for row in report if row[2] == "submitted")
+    rejected = sum(1 for row in report if row[2] == "rejected")
+    print(
+        f"Submitted {submitted} of {len(roster)} roster rows, "
+        f"rejected {rejected} locally, see {report_path}"
+    )
+
+
+def delete_schedule_items(workers=16):
+    import teardown
+
+    return teardown.delete_schedule_items(get_api(), workers=workers)
+
+
+def delete_teams(workers=16):
+    # Seeded teams have a single member, so leaving deletes the team
+    import teardown
+
+    with open("../data/users.csv", mode="r") as users_file:
+        tokens = [row["token"] for row in csv.DictReader(users_file) if row["token"]]
+    return teardown.delete_teams(get_api(), tokens, workers=workers)
+
+
+def delete_test_accounts(workers=16):
+    import teardown
+
+    return teardown.delete_test_accounts(get_api(), workers=workers)
 
 
-# def delete_schedule_items():
-#     helix_db.drop_collection("schedule-items")
+def teardown_all(workers=16, fast=False):
+    # fast=True deletes straight from HELIX_DB (dev databases only)
+    import teardown
+
+    if fast:
+        return teardown.fast_teardown(get_helix_db())
+
+    delete_projects(workers)
+    if os.path.exists("../data/users.csv"):
+        delete_teams(workers)
+    delete_test_accounts(workers)
+    delete_prizes(workers)
+    delete_talks(workers)
+    delete_schedule_items(workers)
 
 
 def create_schedule_items():
     with open("../data/events.csv", mode="r") as events_file:
         csv_reader = csv.DictReader(events_file)
         for row in csv_reader:
-            schedule_data = {
-                "name": row["name"],
-                "description": row["description"],
-                "startTime": int(row["startTime"]),
-                "endTime": int(row["endTime"]),
-                "location": row["location"],
-                "lat": 0,
-                "lng": 0,
-                "platform": "IN_PERSON",
-                "platformUrl": "",
-            }
-            response = requests.post(
-                f"{API_URL}/schedule",
-                json=schedule_data,
-                headers={"x-access-token": JWT_SECRET},
-            )
-            print(
-                f"Response for schedule item creation: {response.status_code} - {response.text}"
-            )
+            response = get_api().post("/schedule", json=schedule_payload(row))
+            log_response("schedule item creation", response)
 
 
-def append_shirt_size_to_dietary_restrictions():
-    for document in helix_db["profiles"].find():
-        dietary_restrictions = document.get("dietaryRestrictions", []) or []
-        shirt_size = document.get("shirtSize", "")
+def bulk_seed_users(n, **options):
+    # Writes users, profiles, teams, projects, check-ins and prizes straight
+    # into HELIX_DB; much faster than the HTTP path for large datasets
+    from bulk_seed import bulk_seed
 
-        if shirt_size:
-            dietary_restrictions.append(f"Shirt size: {shirt_size}")
-            print(
-                f"Updated {document.get('firstName', '')} with updated dietary restrictions: {dietary_restrictions}"
-            )
+    return bulk_seed(get_helix_db(), n, **options)
 
-            result = helix_db["profiles"].update_one(
-                {"_id": document["_id"]},
-                {
-                    "$set": {"dietaryRestrictions": dietary_restrictions}
-                },  # Note: not dietary_restrictions
+
+def load_desired(path, payload):
+    with open(path, mode="r") as file:
+        return {row["name"]: payload(row) for row in csv.DictReader(file)}
+
+
+def reconcile_all(n_projects=None, workers=8, journal_path="../data/reconcile.journal"):
+    # Creates or patches only what differs from the CSVs in ../data (and
+    # tops seeded projects up to n_projects). Safe to re-run after a crash.
+    from reconcile import Journal, reconcile
+
+    journal = Journal(journal_path)
+    ok = True
+    try:
+        ok &= reconcile(
+            "sponsors",
+            get_helix_db()["sponsors"],
+            load_desired("../data/sponsors.csv", sponsor_payload),
+            compare=[],
+            create=lambda payload: get_api().post("/sponsor", json=payload),
+            journal=journal,
+            workers=workers,
+        )
+        ok &= reconcile(
+            "talks",
+            get_helix_db()["checkin-items"],
+            load_desired("../data/talks.csv", talk_payload),
+            compare=["description", "startTime", "endTime", "points", "accessLevel"],
+            create=lambda payload: get_api().post("/check-in", json=payload),
+            patch=lambda _id, diff: get_api().patch(f"/check-in/{_id}", json=diff),
+            journal=journal,
+            workers=workers,
+        )
+        ok &= reconcile(
+            "prizes",
+            get_helix_db()["prizes"],
+            load_desired("../data/prizes.csv", prize_payload),
+            compare=["description", "eligibility"],
+            create=lambda payload: get_api().post("/prizes", json=payload),
+            patch=lambda _id, diff: get_api().patch(f"/prizes/{_id}", json=diff),
+            journal=journal,
+            workers=workers,
+        )
+        ok &= reconcile(
+            "schedule",
+            get_helix_db()["schedule-items"],
+            load_desired("../data/events.csv", schedule_payload),
+            compare=["description", "startTime", "endTime", "location"],
+            create=lambda payload: get_api().post("/schedule", json=payload),
+            patch=lambda _id, diff: get_api().patch(f"/schedule/{_id}", json=diff),
+            journal=journal,
+            workers=workers,
+        )
+        if n_projects:
+            seeded = get_helix_db()["projects"].count_documents(
+                {"name": {"$regex": r"^Project for Team [a-zA-Z0-9-]+@tartanhacks\.com$"}}
             )
-            print(f"Modified {result.modified_count} documents")
+            missing = max(0, n_projects - seeded)
+            print(f"projects: {n_projects} desired, {seeded} existing, creating {missing}")
+            if missing:
+                create_projects(missing, write_csv=False)
+    except BaseException:
+        journal.close()
+        raise
+    journal.close(completed=ok)
+
+
+SHIRT_SIZE_PREFIX = "Shirt size: "
+
+
+def append_shirt_size_to_dietary_restrictions(
+    server_side=True, batch_size=1000, dry_run=False
+):
+    from migrations import migrate_documents, migrate_server_side
+
+    profiles = get_helix_db()["profiles"]
+    filter = {"shirtSize": {"$nin": [None, ""]}}
+
+    if server_side:
+        pipeline = [
+            {
+                "$set": {
+                    "dietaryRestrictions": {
+                        "$concatArrays": [
+                            {"$ifNull": ["$dietaryRestrictions", []]},
+                            [{"$concat": [SHIRT_SIZE_PREFIX, "$shirtSize"]}],
+                        ]
+                    }
+                }
+            }
+        ]
+        return migrate_server_side(profiles, filter, pipeline, dry_run=dry_run)
+
+    def transform(document):
+        dietary_restrictions = document.get("dietaryRestrictions", []) or []
+        dietary_restrictions.append(f"{SHIRT_SIZE_PREFIX}{document['shirtSize']}")
+        return {"$set": {"dietaryRestrictions": dietary_restrictions}}
+
+    return migrate_documents(
+        profiles,
+        transform,
+        filter=filter,
+        projection={"dietaryRestrictions": 1, "shirtSize": 1},
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
 
 
-def remove_shirt_size_from_dietary_restrictions():
-    for document in helix_db["profiles"].find():
+def remove_shirt_size_from_dietary_restrictions(
+    server_side=True, batch_size=1000, dry_run=False
+):
+    from migrations import migrate_documents, migrate_server_side
+
+    profiles = get_helix_db()["profiles"]
+    filter = {"dietaryRestrictions": {"$regex": f"^{SHIRT_SIZE_PREFIX.strip()}"}}
+
+    if server_side:
+        pipeline = [
+            {
+                "$set": {
+                    "dietaryRestrictions": {
+                        "$filter": {
+                            "input": "$dietaryRestrictions",
+                            "as": "restriction",
+                            "cond": {
+                                "$not": [
+                                    {
+                                        "$regexMatch": {
+                                            "input": "$$restriction",
+                                            "regex": f"^{SHIRT_SIZE_PREFIX.strip()}",
+                                        }
+                                    }
+                                ]
+                            },
+                        }
+                    }
+                }
+            }
+        ]
+        return migrate_server_side(profiles, filter, pipeline, dry_run=dry_run)
+
+    def transform(document):
         dietary_restrictions = document.get("dietaryRestrictions", []) or []
 
-        # Filter out any entries that start with "Shirt size: "
+        # Filter out any entries that start with "Shirt size:"
         filtered_restrictions = [
-            r for r in dietary_restrictions if not r.startswith("Shirt size:")
+            r
+            for r in dietary_restrictions
+            if not r.startswith(SHIRT_SIZE_PREFIX.strip())
         ]
+        if filtered_restrictions == dietary_restrictions:
+            return None
+        return {"$set": {"dietaryRestrictions": filtered_restrictions}}
+
+    return migrate_documents(
+        profiles,
+        transform,
+        filter=filter,
+        projection={"dietaryRestrictions": 1},
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
 
-        if filtered_restrictions != dietary_restrictions:
-            print(
-                f'Updating {document.get("firstName", "")} - removing shirt size from dietary restrictions'
-            )
-            print(f"Before: {dietary_restrictions}")
-            print(f"After: {filtered_restrictions}")
 
-            result = helix_db["profiles"].update_one(
-                {"_id": document["_id"]},
-                {"$set": {"dietaryRestrictions": filtered_restrictions}},
+PARTICIPANT_FIELDNAMES = ["_id", "email", "status", "firstName", "lastName", "school", "team"]
+
+
+def export_participants(path="../data/participants.csv"):
+    # Rows are written while /participants is still downloading
+    from list_reader import iter_list
+
+    ensure_data_dir()
+    count = 0
+    with open(path, mode="w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=PARTICIPANT_FIELDNAMES)
+        writer.writeheader()
+        for participant in iter_list(get_api(), "/participants"):
+            profile = participant.get("profile") or {}
+            writer.writerow(
+                {
+                    "_id": participant["_id"],
+                    "email": participant.get("email"),
+                    "status": participant.get("status"),
+                    "firstName": profile.get("firstName"),
+                    "lastName": profile.get("lastName"),
+                    "school": profile.get("school"),
+                    "team": (participant.get("team") or {}).get("name"),
+                }
             )
-            print(f"Modified {result.modified_count} documents\n")
-
-
-def get_pitt_checkins(event_id):
-    # Find all profiles with Pitt email addresses who checked in
-    pipeline = [
-        {
-            "$lookup": {
-                "from": "checkins",
-                "localField": "_id",
-                "foreignField": "user",
-                "as": "checkins",
-            }
-        },
-        {
-            "$lookup": {
-                "from": "profiles",
-                "localField": "_id",
-                "foreignField": "user",
-                "as": "profile",
-            }
-        },
-        {
-            "$match": {
-                "checkins": {"$elemMatch": {"item": ObjectId(event_id)}},
-                "profile.school": "The University of Pittsburgh",
-            }
-        },
-    ]
+            count += 1
+    print(f"Exported {count} participants to {path}")
+
+
+def get_pitt_checkins(event_id, snapshot_path=None):
+    # Find all profiles with Pitt email addresses who checked in, from the
+    # local snapshot when one is given instead of querying the database
+    if snapshot_path:
+        from snapshot import Snapshot, count_attendees
 
-    results = list(helix_db["users"].aggregate(pipeline))
-    print(f"\nFound {len(results)} Pitt students who checked in to event {event_id}")
+        source = Snapshot(snapshot_path)
+    else:
+        from attendance import count_attendees
 
-    # for user in results:
-    # print(f"Email: {user['email']}")
+        source = get_helix_db()
+    count = count_attendees(source, event_id, school="The University of Pittsburgh")
+    print(f"\nFound {count} Pitt students who checked in to event {event_id}")
+
+
+def verify_points(dry_run=False):
+    # Recomputes totalPoints from check-ins and fixes only drifted profiles;
+    # a cheaper alternative to PUT /check-in/recalculate
+    import points
+
+    return points.verify_points(get_helix_db(), get_event_id(), dry_run=dry_run)
 
 
 def add_judges():
@@ -453,9 +956,7 @@ def add_judges():
             if row["email"]:
                 judges.append(row["email"])
 
-        judge_response = requests.post(
-            f"{API_URL}/judges/", json=judges, headers={"x-access-token": JWT_SECRET}
-        )
+        judge_response = get_api().post("/judges/", json=judges)
 
         # Copy users file to judges file using os but only the email and passwords by opening the csv and copying
         with open("../data/users.csv", mode="r") as users_file, open(
@@ -469,50 +970,299 @@ def add_judges():
             for row in csv_reader:
                 writer.writerow({"email": row["email"], "password": row["password"]})
 
-        print(
-            f"Response for judge creation: {judge_response.status_code} - {judge_response.text}"
+        log_response("judge creation", judge_response)
+
+
+def migrate_required_talk_to_list(server_side=True, batch_size=1000, dry_run=False):
+    from migrations import migrate_documents, migrate_server_side
+
+    prizes_collection = get_helix_db()["prizes"]
+    filter = {
+        "requiredTalk": {
+            "$exists": True,
+            "$nin": [None, ""],
+            "$not": {"$type": "array"},
+        }
+    }
+
+    if server_side:
+        pipeline = [{"$set": {"requiredTalk": ["$requiredTalk"]}}]
+        return migrate_server_side(
+            prizes_collection, filter, pipeline, dry_run=dry_run
         )
 
+    return migrate_documents(
+        prizes_collection,
+        lambda prize: {"$set": {"requiredTalk": [prize["requiredTalk"]]}},
+        filter=filter,
+        projection={"requiredTalk": 1},
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
 
-def migrate_required_talk_to_list():
-    prizes_collection = helix_db["prizes"]
-    prizes = prizes_collection.find({"requiredTalk": {"$exists": True}})
 
-    for prize in prizes:
-        required_talk = prize.get("requiredTalk")
-        if required_talk and not isinstance(required_talk, list):
-            prizes_collection.update_one(
-                {"_id": prize["_id"]},
-                {"$set": {"requiredTalk": [required_talk]}}
-            )
-            print(f"Updated prize {prize['_id']} with requiredTalk as a list")
+def run(command):
+    # Runs one command, then prints the metrics summary and writes the
+    # metrics file (if anything was recorded) even if the command fails
+    from metrics import profiling
+
+    ensure_data_dir()
+    try:
+        with profiling(PROFILE, "../data/populate.prof"):
+            command()
+    finally:
+        if "get_metrics" in _lazy:
+            get_metrics().print_summary()
+            get_metrics().write(METRICS_FILE)
+            print(f"Metrics written to {METRICS_FILE}")
+        if "get_governor" in _lazy:
+            get_governor().print_summary()
+            get_governor().write(CONCURRENCY_TRACE_FILE)
+            print(f"Concurrency trace written to {CONCURRENCY_TRACE_FILE}")
+
+
+SEED_COMMANDS = {
+    "users": lambda args: create_users(args.n, workers=args.workers, ordered=args.ordered),
+    "teams": lambda args: create_teams(),
+    "projects": lambda args: create_projects(
+        args.n,
+        user_workers=args.workers,
+        team_workers=args.workers,
+        project_workers=args.workers,
+    ),
+    "judges": lambda args: create_judges(args.n),
+    "add-judges": lambda args: add_judges(),
+    "sponsors": lambda args: create_sponsors(),
+    "talks": lambda args: create_talks(),
+    "prizes": lambda args: create_prizes(),
+    "schedule": lambda args: create_schedule_items(),
+    "reconcile": lambda args: reconcile_all(args.n or None, workers=args.workers),
+}
+
+TEARDOWN_COMMANDS = {
+    "projects": lambda args: delete_projects(args.workers),
+    "prizes": lambda args: delete_prizes(args.workers),
+    "talks": lambda args: delete_talks(args.workers),
+    "schedule": lambda args: delete_schedule_items(args.workers),
+    "teams": lambda args: delete_teams(args.workers),
+    "test-accounts": lambda args: delete_test_accounts(args.workers),
+    "all": lambda args: teardown_all(args.workers, fast=args.fast),
+    "judging-db": lambda args: delete_judging_database(),
+}
+
+MIGRATE_COMMANDS = {
+    "append-shirt-size": append_shirt_size_to_dietary_restrictions,
+    "remove-shirt-size": remove_shirt_size_from_dietary_restrictions,
+    "required-talk-list": migrate_required_talk_to_list,
+}
+
+
+def check_in_command(args):
+    if args.roster:
+        bulk_check_in(args.roster, workers=args.workers, rate=args.rate)
+    else:
+        check_in_user(get_user_id(args.email), get_check_in_item_id(args.item))
+
+
+def submit_command(args):
+    if args.roster:
+        bulk_submit(args.roster, workers=args.workers)
+    elif args.project and args.prize:
+        submit_to_prize(get_project_id(args.project), get_prize_id(args.prize))
+    else:
+        raise SystemExit("submit needs --roster, or --project and --prize")
+
+
+def migrate_command(args):
+    MIGRATE_COMMANDS[args.migration](
+        server_side=not args.client_side,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+    )
+
+
+def export_command(args):
+    if args.report == "pitt-checkins":
+        if not args.event:
+            raise SystemExit("export pitt-checkins needs --event")
+        get_pitt_checkins(args.event, args.snapshot)
+    elif args.report == "participants":
+        export_participants()
+    elif args.snapshot:
+        if args.report != "projects":
+            raise SystemExit("export --snapshot supports pitt-checkins and projects")
+        from get_project_csv import PRIZES_TO_CONSIDER, write_projects
+        from snapshot import Snapshot, project_rows
+
+        write_projects(
+            project_rows(Snapshot(args.snapshot), PRIZES_TO_CONSIDER), compress=args.gzip
+        )
+    elif args.incremental:
+        if args.report != "projects":
+            raise SystemExit("export --incremental only supports projects")
+        from get_project_csv import export_projects_incremental
+
+        export_projects_incremental(uri=MONGO_CONNECTION_STRING, db_name=HELIX_DB)
+    else:
+        from get_project_csv import run_export
+
+        run_export(
+            args.report,
+            compress=args.gzip,
+            processes=args.processes,
+            uri=MONGO_CONNECTION_STRING,
+            db_name=HELIX_DB,
+        )
+
+
+def attendance_command(args):
+    # Index upkeep and plan checks for the attendance queries behind
+    # export pitt-checkins
+    import attendance
+
+    if not args.explain and not args.ensure_indexes:
+        raise SystemExit("attendance needs --explain and/or --ensure-indexes")
+    if args.explain and not args.event:
+        raise SystemExit("attendance --explain needs --event")
+
+    db = get_helix_db()
+    if args.ensure_indexes:
+        attendance.ensure_attendance_indexes(db)
+        print(f"Ensured attendance indexes on {', '.join(attendance.ATTENDANCE_INDEXES)}")
+    if args.explain:
+        profile_filter = {"school": args.school} if args.school else {}
+        if not attendance.check_query_plans(db, args.event, **profile_filter):
+            print("Attendance queries are served by indexes")
+
+
+def snapshot_command(args):
+    from snapshot import take_snapshot
+
+    take_snapshot(get_helix_db(), args.path)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Seed and manage TartanHacks dev data")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report how long startup took and which heavy modules were loaded",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="create data through the API")
+    seed.add_argument("what", choices=sorted(SEED_COMMANDS))
+    seed.add_argument("-n", type=int, default=0, help="number of users/projects/judges")
+    seed.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    seed.add_argument("--ordered", action="store_true", help="keep users.csv in creation order")
+    seed.set_defaults(func=lambda args: SEED_COMMANDS[args.what](args))
+
+    bulk = commands.add_parser(
+        "bulk-seed",
+        help=f"insert synthetic data straight into {HELIX_DB} with insert_many, bypassing the API",
+    )
+    bulk.add_argument("-n", type=int, required=True, help="number of users")
+    bulk.add_argument("--realistic", action="store_true", help="skewed distributions")
+    bulk.add_argument("--seed", type=int, help="RNG seed")
+    bulk.set_defaults(
+        func=lambda args: bulk_seed_users(args.n, realistic=args.realistic, seed=args.seed)
+    )
+
+    teardown = commands.add_parser("teardown", help="delete seeded data")
+    teardown.add_argument("what", choices=sorted(TEARDOWN_COMMANDS))
+    teardown.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    teardown.add_argument("--fast", action="store_true", help="all: delete directly in a -dev db")
+    teardown.set_defaults(func=lambda args: TEARDOWN_COMMANDS[args.what](args))
+
+    check_in = commands.add_parser("check-in", help="check users in to check-in items")
+    check_in.add_argument("--roster", help="CSV of email,item pairs")
+    check_in.add_argument("--email")
+    check_in.add_argument("--item", help="check-in item name")
+    check_in.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    check_in.add_argument("--rate", type=float, default=20, help="max check-ins per second")
+    check_in.set_defaults(func=check_in_command)
+
+    submit = commands.add_parser("submit", help="enter projects into prizes")
+    submit.add_argument("--roster", help="CSV of project,prize name pairs")
+    submit.add_argument("--project", help="project name")
+    submit.add_argument("--prize", help="prize name")
+    submit.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    submit.set_defaults(func=submit_command)
+
+    migrate = commands.add_parser("migrate", help="run a data migration")
+    migrate.add_argument("migration", choices=sorted(MIGRATE_COMMANDS))
+    migrate.add_argument("--dry-run", action="store_true")
+    migrate.add_argument("--client-side", action="store_true", help="stream and bulk_write instead of update_many")
+    migrate.add_argument("--batch-size", type=int, default=1000)
+    migrate.set_defaults(func=migrate_command)
+
+    export = commands.add_parser("export", help="write reports")
+    export.add_argument(
+        "report",
+        choices=[
+            "pitt-checkins",
+            "participants",
+            "projects",
+            "users",
+            "profiles",
+            "checkins",
+            "bookmarks",
+        ],
+    )
+    export.add_argument("--event", help="pitt-checkins: check-in item _id")
+    export.add_argument("--gzip", action="store_true")
+    export.add_argument("--processes", type=int, default=1)
+    export.add_argument("--incremental", action="store_true", help="projects: merge changes since the last run")
+    export.add_argument("--snapshot", help="read from a local snapshot directory instead of MongoDB")
+    export.set_defaults(func=export_command)
+
+    attendance = commands.add_parser("attendance", help="check-in attendance query helpers")
+    attendance.add_argument("--event", help="check-in item _id to explain the queries for")
+    attendance.add_argument("--school", help="explain with this profile school filter")
+    attendance.add_argument("--explain", action="store_true", help="warn about collection scans")
+    attendance.add_argument(
+        "--ensure-indexes", action="store_true", help="create the indexes the queries need"
+    )
+    attendance.set_defaults(func=attendance_command)
+
+    snapshot = commands.add_parser("snapshot", help="pull a local columnar snapshot for reports")
+    snapshot.add_argument("--path", default="../data/snapshot")
+    snapshot.set_defaults(func=snapshot_command)
+
+    verify = commands.add_parser("verify-points", help="recompute totalPoints and fix drift")
+    verify.add_argument("--dry-run", action="store_true", help="report drift without writing")
+    verify.set_defaults(func=lambda args: verify_points(dry_run=args.dry_run))
+
+    tables = commands.add_parser("tables", help="allocate expo table numbers")
+    tables.add_argument("--bulk", action="store_true", help="one bulk_write to a -dev db; reassigns tables")
+    tables.add_argument("--dry-run", action="store_true", help="print the layout only")
+    tables.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    tables.set_defaults(
+        func=lambda args: assign_tables(bulk=args.bulk, workers=args.workers, dry_run=args.dry_run)
+    )
+
+    judging = commands.add_parser("judging", help="judging service helpers")
+    judging.add_argument("action", choices=["sync"])
+    judging.set_defaults(func=lambda args: synchronize())
+
+    return parser
+
+
+def report_startup():
+    elapsed = (time.perf_counter() - _STARTED) * 1000
+    heavy = [name for name in ("pymongo", "requests", "bson") if name in sys.modules]
+    print(
+        f"Startup: {elapsed:.1f} ms, {len(sys.modules)} modules loaded, "
+        f"heavy modules loaded: {', '.join(heavy) or 'none'}"
+    )
+
 
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile_startup:
+        report_startup()
+    run(lambda: args.func(args))
 
 
 if __name__ == "__main__":
-    # create_users(3)
-    # create_judges(3)
-    # delete_projects()
-    # create_projects(10)
-    # delete_judging_database()
-    # add_judges()
-    # synchronize()
-    # create_sponsors()
-    # delete_checkins()
-    # delete_talks()
-    # create_talks()
-    # delete_prizes()
-    # create_prizes()
-    check_in_user(get_user_id("madeline-apricot@tartanhacks.com"), get_check_in_item_id("Sponsor Event: AppLovin (Tech Talk/Networking)"))
-    check_in_user(get_user_id("madeline-apricot@tartanhacks.com"), get_check_in_item_id("Sponsor Event: AppLovin (Recruiting)"))
-    check_in_user(get_user_id("xavilien@gmail.com"), get_check_in_item_id("Sponsor Event: AppLovin (Tech Talk/Networking)"))
-    check_in_user(get_user_id("xavilien@gmail.com"), get_check_in_item_id("Sponsor Event: AppLovin (Recruiting)"))
-    # migrate_required_talk_to_list()
-    submit_to_prize(get_project_id("Project for Team madeline-apricot@tartanhacks.com"), get_prize_id("Best Content Creation Hack"))
-    # submit_to_prize(get_project_id("Project for Team madeline-apricot@tartanhacks.com"), get_prize_id("Scott Krulcik Grand Prize"))
-    # delete_schedule_items()
-    # create_schedule_items()
-    # append_shirt_size_to_dietary_restrictions()
-    # remove_shirt_size_from_dietary_restrictions()
-    # get_pitt_checkins("67a53838c799260008f91957")
-    ...
+    main()
@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Journal:
+    # Append-only record of completed operations. An interrupted run
+    # replays it on start and skips everything already done; a fully
+    # successful run removes it.
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crash can leave a partial last line
+                        continue
+                    self.done[entry["key"]] = entry.get("_id")
+        self.file = open(path, "a")
+        self.lock = threading.Lock()
+
+    def record(self, key, _id=None):
+        with self.lock:
+            self.done[key] = _id
+            self.file.write(json.dumps({"key": key, "_id": _id}) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self, completed=False):
+        self.file.close()
+        if completed:
+            os.remove(self.path)
+
+
+def reconcile(
+    kind,
+    collection,
+    desired,
+    compare,
+    create,
+    patch=None,
+    journal=None,
+    key="name",
+    workers=8,
+):
+    # desired maps each entity key to the payload it should be created with.
+    # Existing state is loaded with one projected find; only missing
+    # entities are created and, when patch is given, only the compared
+    # fields that differ are patched. create/patch return a response.
+    existing = {
+        document[key]: document
+        for document in collection.find(
+            {key: {"$in": list(desired)}}, {key: 1, **{field: 1 for field in compare}}
+        )
+    }
+
+    creates, patches = [], []
+    for name, payload in desired.items():
+        journal_key = f"{kind}:{name}"
+        if journal is not None and journal_key in journal.done:
+            continue
+        document = existing.get(name)
+        if document is None:
+            creates.append((journal_key, payload))
+            continue
+        diff = {
+            field: payload[field]
+            for field in compare
+            if field in payload and document.get(field) != payload[field]
+        }
+        if diff and patch is not None:
+            patches.append((journal_key, str(document["_id"]), diff))
+
+    failures = []
+
+    def run_create(entry):
+        journal_key, payload = entry
+        response = create(payload)
+        if not response.ok:
+            failures.append((journal_key, response.status_code))
+        elif journal is not None:
+            journal.record(journal_key, response.json().get("_id"))
+
+    def run_patch(entry):
+        journal_key, _id, diff = entry
+        response = patch(_id, diff)
+        if not response.ok:
+            failures.append((journal_key, response.status_code))
+        elif journal is not None:
+            journal.record(journal_key, _id)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(run_create, creates))
+        list(executor.map(run_patch, patches))
+
+    print(
+        f"{kind}: {len(desired)} desired, {len(existing)} existing, "
+        f"{len(creates)} created, {len(patches)} patched, {len(failures)} failed"
+    )
+    for journal_key, status in failures:
+        print(f"Failed to reconcile {journal_key}: {status}")
+    return not failures
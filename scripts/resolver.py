@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class Resolver:
+    """
+    In-memory name -> ObjectId index over one collection.
+    Misses are resolved with a single $in query per batch, and warm() loads
+    the whole key -> _id mapping with one projected find. Entries can expire
+    after ttl seconds, and the index can be capped at max_size entries (LRU).
+    """
+
+    def __init__(self, collection, key, ttl=None, max_size=None):
+        self.collection = collection
+        self.key = key
+        self.ttl = ttl
+        self.max_size = max_size
+        self.index = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get(self, value):
+        entry = self.index.get(value)
+        if entry is None:
+            return None
+        _id, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self.index[value]
+            return None
+        self.index.move_to_end(value)
+        return _id
+
+    def _put(self, value, _id):
+        self.index[value] = (_id, time.monotonic())
+        self.index.move_to_end(value)
+        if self.max_size is not None:
+            while len(self.index) > self.max_size:
+                self.index.popitem(last=False)
+
+    def _load(self, filter):
+        documents = self.collection.find(filter, {self.key: 1})
+        with self.lock:
+            for document in documents:
+                if self.key in document:
+                    self._put(document[self.key], document["_id"])
+
+    def warm(self):
+        self._load({})
+        return self
+
+    def resolve_many(self, values):
+        values = list(dict.fromkeys(values))
+        with self.lock:
+            missing = [value for value in values if self._get(value) is None]
+        if missing:
+            self._load({self.key: {"$in": missing}})
+        with self.lock:
+            return {value: self._get(value) for value in values}
+
+    def resolve(self, value):
+        return self.resolve_many([value])[value]
+
+    def clear(self):
+        with self.lock:
+            self.index.clear()
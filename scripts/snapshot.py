@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+SNAPSHOT_DIR = "../data/snapshot"
+
+# Per collection: field -> kind. "ref" and "refs" hold ObjectIds encoded as
+# int64 codes into the snapshot-wide id dictionary, "str" is dictionary
+# encoded, "num" and "bool" are stored as they are.
+SCHEMA = {
+    "users": {"_id": "ref", "email": "str"},
+    "profiles": {"_id": "ref", "user": "ref", "school": "str", "totalPoints": "num"},
+    "teams": {"_id": "ref", "name": "str", "members": "refs"},
+    "projects": {
+        "_id": "ref",
+        "name": "str",
+        "description": "str",
+        "url": "str",
+        "slides": "str",
+        "video": "str",
+        "team": "ref",
+        "prizes": "refs",
+        "presentingVirtually": "bool",
+    },
+    "prizes": {"_id": "ref", "name": "str", "requiredTalk": "refs"},
+    "checkins": {"user": "ref", "item": "ref"},
+    "checkin-items": {"_id": "ref", "name": "str", "points": "num"},
+}
+
+
+class Dictionary:
+    # Maps values to dense integer codes, in first-seen order
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def take_snapshot(db, path=SNAPSHOT_DIR, batch_size=5000):
+    # One projected, streamed read per collection into column arrays
+    started = time.perf_counter()
+    ids = Dictionary()
+    for collection, fields in SCHEMA.items():
+        columns = {field: [] for field in fields}
+        offsets = {field: [0] for field, kind in fields.items() if kind == "refs"}
+        strings = {field: Dictionary() for field, kind in fields.items() if kind == "str"}
+
+        count = 0
+        cursor = db[collection].find({}, {field: 1 for field in fields}, batch_size=batch_size)
+        for document in cursor:
+            count += 1
+            for field, kind in fields.items():
+                value = document.get(field)
+                if kind == "ref":
+                    columns[field].append(ids.encode(str(value)) if value is not None else -1)
+                elif kind == "refs":
+                    if not isinstance(value, list):
+                        value = [value] if value else []
+                    columns[field].extend(ids.encode(str(v)) for v in value)
+                    offsets[field].append(len(columns[field]))
+                elif kind == "str":
+                    columns[field].append(strings[field].encode(value))
+                elif kind == "bool":
+                    columns[field].append(bool(value))
+                else:
+                    columns[field].append(np.nan if value is None else value)
+
+        directory = os.path.join(path, collection)
+        os.makedirs(directory, exist_ok=True)
+        for field, kind in fields.items():
+            dtype = {"ref": np.int64, "refs": np.int64, "str": np.int32, "bool": np.bool_}.get(
+                kind, np.float64
+            )
+            np.save(os.path.join(directory, f"{field}.npy"), np.asarray(columns[field], dtype=dtype))
+            if kind == "refs":
+                np.save(
+                    os.path.join(directory, f"{field}.offsets.npy"),
+                    np.asarray(offsets[field], dtype=np.int64),
+                )
+            if kind == "str":
+                with open(os.path.join(directory, f"{field}.dict.json"), "w") as f:
+                    json.dump(strings[field].values, f)
+        print(f"Snapshot {collection}: {count} documents")
+
+    with open(os.path.join(path, "ids.json"), "w") as f:
+        json.dump(ids.values, f)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"database": db.name, "taken_at": time.time()}, f)
+    print(f"Snapshot written to {path} in {time.perf_counter() - started:.1f}s")
+
+
+class Snapshot:
+    # Read side: columns are memory-mapped and loaded on first access
+    def __init__(self, path=SNAPSHOT_DIR):
+        self.path = path
+        self._arrays = {}
+        self._dicts = {}
+        self._ids = None
+
+    def column(self, collection, field, suffix=""):
+        key = (collection, field, suffix)
+        if key not in self._arrays:
+            self._arrays[key] = np.load(
+                os.path.join(self.path, collection, f"{field}{suffix}.npy"), mmap_mode="r"
+            )
+        return self._arrays[key]
+
+    def offsets(self, collection, field):
+        return self.column(collection, field, ".offsets")
+
+    def strings(self, collection, field):
+        key = (collection, field)
+        if key not in self._dicts:
+            with open(os.path.join(self.path, collection, f"{field}.dict.json")) as f:
+                self._dicts[key] = Dictionary(json.load(f))
+        return self._dicts[key]
+
+    def ids(self):
+        if self._ids is None:
+            with open(os.path.join(self.path, "ids.json")) as f:
+                self._ids = Dictionary(json.load(f))
+        return self._ids
+
+    def id_code(self, object_id):
+        return self.ids().codes.get(str(object_id), -2)
+
+    def string_code(self, collection, field, value):
+        return self.strings(collection, field).codes.get(value, -2)
+
+    def decode(self, collection, field, codes):
+        values = self.strings(collection, field).values
+        return [values[code] if code >= 0 else None for code in codes]
+
+    def row_index(self, collection, codes):
+        # Positions of the given _id codes within a collection, -1 if absent
+        ids = np.asarray(self.column(collection, "_id"))
+        order = np.argsort(ids)
+        sorted_ids = ids[order]
+        positions = np.searchsorted(sorted_ids, codes)
+        positions = np.clip(positions, 0, max(len(sorted_ids) - 1, 0))
+        if not len(sorted_ids):
+            return np.full(len(codes), -1)
+        return np.where(sorted_ids[positions] == codes, order[positions], -1)
+
+    def list_rows(self, collection, field):
+        # Row number of every element of a list column
+        offsets = np.asarray(self.offsets(collection, field))
+        return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def count_attendees(snapshot, event_id, **profile_filter):
+    # Snapshot version of attendance.count_attendees: distinct users checked
+    # in to the item whose profile matches every string attribute given
+    item = snapshot.id_code(event_id)
+    attended = np.unique(
+        np.asarray(snapshot.column("checkins", "user"))[
+            np.asarray(snapshot.column("checkins", "item")) == item
+        ]
+    )
+
+    mask = np.isin(np.asarray(snapshot.column("profiles", "user")), attended)
+    for field, value in profile_filter.items():
+        mask &= np.asarray(snapshot.column("profiles", field)) == snapshot.string_code(
+            "profiles", field, value
+        )
+    return int(np.unique(np.asarray(snapshot.column("profiles", "user"))[mask]).size)
+
+
+def project_rows(snapshot, prize_names=()):
+    # Snapshot version of get_project_csv.load_project_info: projects that
+    # entered any of prize_names (or any prize at all if none are given)
+    prize_ids = np.asarray(snapshot.column("prizes", "_id"))
+    prize_name_codes = np.asarray(snapshot.column("prizes", "name"))
+    if prize_names:
+        wanted = [snapshot.string_code("prizes", "name", name) for name in prize_names]
+        considered = prize_ids[np.isin(prize_name_codes, wanted)]
+    else:
+        considered = prize_ids
+
+    entries = np.asarray(snapshot.column("projects", "prizes"))
+    entry_rows = snapshot.list_rows("projects", "prizes")
+    hits = np.isin(entries, considered)
+    n_projects = len(snapshot.column("projects", "_id"))
+    matching = np.bincount(entry_rows[hits], minlength=n_projects) > 0
+
+    team_rows = snapshot.row_index(
+        "teams", np.asarray(snapshot.column("projects", "team"))[matching]
+    )
+    team_names = snapshot.decode(
+        "teams",
+        "name",
+        np.where(
+            team_rows >= 0,
+            np.asarray(snapshot.column("teams", "name"))[np.maximum(team_rows, 0)],
+            -1,
+        ),
+    )
+
+    # Prize name per hit entry, grouped back to its project
+    prize_rows = snapshot.row_index("prizes", entries[hits])
+    hit_names = snapshot.decode("prizes", "name", prize_name_codes[prize_rows])
+    names_by_project = {}
+    for row, name in zip(entry_rows[hits], hit_names):
+        names_by_project.setdefault(row, []).append(name)
+
+    rows = np.flatnonzero(matching)
+    columns = {
+        field: snapshot.decode(
+            "projects", field, np.asarray(snapshot.column("projects", field))[rows]
+        )
+        for field in ["name", "description", "url", "slides", "video"]
+    }
+    for i, row in enumerate(rows):
+        yield {
+            **{field: values[i] for field, values in columns.items()},
+            "team_name": team_names[i],
+            "prizes": names_by_project.get(row, []),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local columnar snapshot for reports")
+    parser.add_argument("--path", default=SNAPSHOT_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("take", help="pull a fresh snapshot from MONGODB_URI")
+    pitt = commands.add_parser("pitt-checkins")
+    pitt.add_argument("--event", required=True)
+    pitt.add_argument("--school", default="The University of Pittsburgh")
+    projects = commands.add_parser("projects")
+    projects.add_argument("--prize", action="append", default=[])
+    args = parser.parse_args()
+
+    if args.command == "take":
+        import pymongo
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        client = pymongo.MongoClient(os.getenv("MONGODB_URI"))
+        take_snapshot(client[os.getenv("SNAPSHOT_DB", "tartanhacks-25-dev")], args.path)
+    elif args.command == "pitt-checkins":
+        started = time.perf_counter()
+        count = count_attendees(Snapshot(args.path), args.event, school=args.school)
+        print(f"Found {count} students who checked in to event {args.event}")
+        print(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+    else:
+        for row in project_rows(Snapshot(args.path), args.prize):
+            print(row)
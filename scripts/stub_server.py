@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class StubConfig:
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample(self):
+        with self.lock:
+            delay = max(0, self.random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+            fail = self.random.random() < self.error_rate
+        return delay, fail
+
+
+def fake_document(path, body):
+    # Enough of each backend response shape for populate.py to keep going
+    document = dict(body) if isinstance(body, dict) else {}
+    _id = os.urandom(12).hex()
+    document.setdefault("_id", _id)
+    if path.startswith("/test-account"):
+        document.update(
+            email=f"stub-{_id}@tartanhacks.com",
+            password="stub-password",
+            token=f"stub-token-{_id}",
+            status="CONFIRMED",
+        )
+    elif path.startswith("/auth/login"):
+        document.update(token=f"stub-token-{_id}", judge=True)
+    return document
+
+
+class StubServer(ThreadingHTTPServer):
+    # The socketserver default backlog of 5 drops bursts of connections
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Avoid Nagle/delayed-ACK stalls on keep-alive connections
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def log_message(self, format, *args):
+            pass
+
+        def respond(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                body = None
+
+            delay, fail = config.sample()
+            time.sleep(delay)
+
+            path = urlparse(self.path).path
+            if fail:
+                status, payload = 500, {"message": "Injected failure"}
+            elif self.command == "GET" and path.rstrip("/") in ("/projects", "/prizes", "/users"):
+                status, payload = 200, []
+            else:
+                status, payload = 200, fake_document(path, body)
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = respond
+
+    return StubHandler
+
+
+def serve_in_thread(config, host="127.0.0.1", port=0):
+    # Returns the running server; its base URL is http://host:server.server_port
+    server = StubServer((host, port), make_handler(config))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the backend")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    server = StubServer(("127.0.0.1", args.port), make_handler(config))
+    print(f"Stub backend listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -0,0 +1,155 @@
+import datetime
+import random
+
+from bulk_seed import (
+    check_in_item_document,
+    checkin_document,
+    prize_document,
+    profile_document,
+    project_document,
+    team_document,
+    user_document,
+)
+
+# Weighted distributions, roughly shaped like past TartanHacks registrations
+SCHOOLS = [
+    ("Carnegie Mellon University", 55),
+    ("The University of Pittsburgh", 18),
+    ("Penn State University", 6),
+    ("Case Western Reserve University", 4),
+    ("University of Michigan", 3),
+    ("Duquesne University", 3),
+    ("Ohio State University", 2),
+    ("Rochester Institute of Technology", 2),
+    ("University of Maryland", 2),
+    ("Other", 5),
+]
+MAJORS = [
+    ("Computer Science", 40),
+    ("Electrical and Computer Engineering", 15),
+    ("Information Systems", 7),
+    ("Mathematics", 6),
+    ("Statistics and Machine Learning", 6),
+    ("Mechanical Engineering", 5),
+    ("Design", 4),
+    ("Physics", 3),
+    ("Business Administration", 3),
+    ("Other", 11),
+]
+GRADUATION_YEARS = [(2025, 15), (2026, 25), (2027, 28), (2028, 22), (2029, 10)]
+TEAM_SIZES = [(1, 15), (2, 20), (3, 30), (4, 35)]
+PRIZES_PER_PROJECT = [(1, 35), (2, 35), (3, 20), (4, 10)]
+SHIRT_SIZES = [("S", 20), ("M", 35), ("L", 25), ("XL", 10), ("WS", 5), ("WM", 5)]
+
+# Zipf exponent for talk and prize popularity
+POPULARITY_SKEW = 1.1
+
+
+def weighted(rng, distribution):
+    values, weights = zip(*distribution)
+    return rng.choices(values, weights)[0]
+
+
+def zipf_weights(n, skew=POPULARITY_SKEW):
+    return [1 / (rank**skew) for rank in range(1, n + 1)]
+
+
+def sample_distinct(rng, population, weights, k):
+    # Weighted sampling without replacement
+    chosen = {}
+    while len(chosen) < min(k, len(population)):
+        item = rng.choices(population, weights)[0]
+        chosen[id(item)] = item
+    return list(chosen.values())
+
+
+def generate(
+    event_id,
+    password_hash,
+    scale,
+    seed=None,
+    n_talks=20,
+    n_prizes=15,
+    mean_checkins=3,
+    required_talk_rate=0.3,
+    prefix=None,
+):
+    # Yields (collection, document) records for `scale` users. Only the
+    # talks, prizes and the team being filled are held in memory, so memory
+    # stays flat however large scale is.
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+    prefix = prefix or f"synth{rng.getrandbits(16):04x}"
+    start = int(now.timestamp() * 1000)
+
+    talks = []
+    for i in range(n_talks):
+        begins = start + i * 30 * 60 * 1000
+        talks.append(
+            check_in_item_document(
+                event_id,
+                f"Talk {prefix}-{i}",
+                rng.choice([5, 10, 10, 20, 50]),
+                now,
+                start_time=begins,
+                end_time=begins + 60 * 60 * 1000,
+            )
+        )
+    talk_weights = zipf_weights(n_talks)
+
+    prizes = []
+    for i in range(n_prizes):
+        required = [rng.choice(talks)["_id"]] if rng.random() < required_talk_rate else []
+        prizes.append(prize_document(event_id, f"Prize {prefix}-{i}", now, required))
+    prize_weights = zipf_weights(n_prizes)
+
+    for talk in talks:
+        yield "checkin-items", talk
+    for prize in prizes:
+        yield "prizes", prize
+
+    members = []
+    team_size = weighted(rng, TEAM_SIZES)
+    team_index = 0
+    for i in range(scale):
+        user = user_document(f"{prefix}-{i}@tartanhacks.com", password_hash, now)
+        yield "users", user
+
+        # Geometric number of check-ins, spread over talks by popularity.
+        # Drawn before the profile so its totalPoints matches them.
+        n_attended = 0
+        while rng.random() < mean_checkins / (mean_checkins + 1):
+            n_attended += 1
+        attended = sample_distinct(rng, talks, talk_weights, n_attended)
+        yield "profiles", profile_document(
+            event_id,
+            user,
+            now,
+            rng,
+            school=weighted(rng, SCHOOLS),
+            major=weighted(rng, MAJORS),
+            graduationYear=weighted(rng, GRADUATION_YEARS),
+            shirtSize=weighted(rng, SHIRT_SIZES),
+            totalPoints=sum(talk["points"] for talk in attended),
+        )
+        for talk in attended:
+            yield "checkins", checkin_document(event_id, user["_id"], talk["_id"], now)
+
+        members.append(user["_id"])
+        if len(members) == team_size or i == scale - 1:
+            team = team_document(event_id, f"Team {prefix}-{team_index}", members, now)
+            yield "teams", team
+            entered = sample_distinct(
+                rng, prizes, prize_weights, weighted(rng, PRIZES_PER_PROJECT)
+            )
+            yield "projects", project_document(
+                event_id,
+                team,
+                [prize["_id"] for prize in entered],
+                now,
+                presenting_virtually=rng.random() < 0.1,
+            )
+            members = []
+            team_size = weighted(rng, TEAM_SIZES)
+            team_index += 1
+
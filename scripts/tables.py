@@ -0,0 +1,123 @@
+import time
+from collections import Counter
+
+from teardown import is_dev_database, run_concurrently
+
+PROJECTION = {"_id": 1, "name": 1, "prizes": 1, "presentingVirtually": 1, "tableNumber": 1}
+
+
+def load_projects(db, event_id):
+    # Everything the layout needs for one event, in one projected query
+    return list(db["projects"].find({"event": event_id}, PROJECTION))
+
+
+def layout(projects):
+    """
+    Returns the in-person projects in table order.
+    Each project's prizes are ranked by how many projects entered them, and
+    projects are sorted on that ranked list: everyone in the most contested
+    prize sits in one contiguous block, subdivided by their next prize, and
+    so on. Ties fall back to name and _id, so the same projects always get
+    the same tables.
+    """
+    in_person = [project for project in projects if not project.get("presentingVirtually")]
+    popularity = Counter(
+        str(prize) for project in in_person for prize in project.get("prizes") or []
+    )
+
+    def signature(prizes):
+        ranked = sorted((str(prize) for prize in prizes or []), key=lambda p: (-popularity[p], p))
+        # Projects without prizes go after every prize block
+        return (0, [(-popularity[p], p) for p in ranked]) if ranked else (1, [])
+
+    return sorted(
+        in_person,
+        key=lambda project: (
+            signature(project.get("prizes")),
+            project.get("name") or "",
+            str(project["_id"]),
+        ),
+    )
+
+
+def number_tables(ordered, reserved=(), first_table=1):
+    # Consecutive table numbers in layout order, skipping reserved ones
+    reserved = {str(table) for table in reserved}
+    assignments = []
+    table = first_table
+    for project in ordered:
+        while str(table) in reserved:
+            table += 1
+        assignments.append((project, str(table)))
+        table += 1
+    return assignments
+
+
+def assign_http(api, assignments, workers=16):
+    pending = [(project["_id"], table) for project, table in assignments]
+    return run_concurrently(
+        "Assigning tables",
+        pending,
+        lambda item: api.patch(
+            f"/projects/{item[0]}/table-number", json={"tableNumber": item[1]}
+        ),
+        workers=workers,
+    )
+
+
+def assign_bulk(db, assignments):
+    # Dev-only: writes every assignment in one unordered bulk_write,
+    # overwriting existing table numbers
+    from pymongo import UpdateOne
+
+    if not is_dev_database(db.name):
+        raise ValueError(f"Refusing to bulk assign tables in {db.name}")
+    changed = [
+        UpdateOne({"_id": project["_id"]}, {"$set": {"tableNumber": table}})
+        for project, table in assignments
+        if project.get("tableNumber") != table
+    ]
+    if not changed:
+        return 0
+    return db["projects"].bulk_write(changed, ordered=False).modified_count
+
+
+def allocate_tables(
+    db, event_id, api=None, bulk=False, workers=16, dry_run=False, first_table=1
+):
+    """
+    Lays out the event's in-person projects and assigns their tables.
+    The PATCH endpoint refuses projects that already have a table, so over
+    HTTP only unassigned projects are numbered, with numbers no project
+    holds yet. bulk=True re-lays out every in-person project, keeping clear
+    of the tables virtual projects still hold.
+    """
+    started = time.perf_counter()
+    projects = load_projects(db, event_id)
+    ordered = layout(projects)
+    if bulk:
+        reserved = [
+            project["tableNumber"]
+            for project in projects
+            if project.get("presentingVirtually") and project.get("tableNumber")
+        ]
+    else:
+        reserved = [project["tableNumber"] for project in projects if project.get("tableNumber")]
+        ordered = [project for project in ordered if not project.get("tableNumber")]
+    assignments = number_tables(ordered, reserved, first_table)
+    print(
+        f"Laid out {len(assignments)} tables for {len(projects)} projects "
+        f"({len(reserved)} tables already taken) "
+        f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    if dry_run:
+        for project, table in assignments:
+            print(f"{table}\t{project.get('name')}")
+        return assignments
+
+    if bulk:
+        count = assign_bulk(db, assignments)
+    else:
+        count = assign_http(api, assignments, workers)
+    print(f"Assigned {count} tables in {time.perf_counter() - started:.1f}s")
+    return assignments
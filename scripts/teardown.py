@@ -0,0 +1,159 @@
+import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from list_reader import iter_list
+
+TEST_ACCOUNT_EMAIL = re.compile(r"[a-zA-Z0-9-]+@tartanhacks\.com")
+# Dev databases and the fixture databases cloned from them
+# (tartanhacks-25-dev, tartanhacks-25-dev-template, tartanhacks-25-dev-shard-3)
+DEV_DATABASE = re.compile(r"-dev(-[a-z0-9-]+)?$")
+
+
+class Progress:
+    # Single-line progress counter shared by worker threads; total is None
+    # while items are still streaming in
+    def __init__(self, label, total=None):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def update(self, ok):
+        with self.lock:
+            self.done += 1
+            self.failed += 0 if ok else 1
+            count = self.done if self.total is None else f"{self.done}/{self.total}"
+            sys.stdout.write(f"\r{self.label}: {count} ({self.failed} failed)")
+            if self.done == self.total:
+                sys.stdout.write("\n")
+            sys.stdout.flush()
+
+    def close(self):
+        if self.total is None and self.done:
+            sys.stdout.write("\n")
+            sys.stdout.flush()
+
+
+def run_concurrently(label, items, call, workers=16):
+    # call(item) returns a response; anything but a 2xx counts as a failure.
+    # items may be a generator: work starts on the first item, and at most a
+    # few items per worker are pulled ahead of the ones in flight.
+    progress = Progress(label, len(items) if hasattr(items, "__len__") else None)
+    failures = []
+    slots = threading.BoundedSemaphore(workers * 4)
+
+    def run(item):
+        try:
+            response = call(item)
+            ok = response.ok
+            detail = response.status_code
+        except Exception as e:
+            ok, detail = False, repr(e)
+        finally:
+            slots.release()
+        if not ok:
+            failures.append((item, detail))
+        progress.update(ok)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            slots.acquire()
+            executor.submit(run, item)
+    progress.close()
+    if not progress.done:
+        print(f"{label}: nothing to do")
+    for item, detail in failures:
+        print(f"{label} failed for {item}: {detail}")
+    return progress.done - len(failures)
+
+
+def delete_listed(api, path, label, workers=16):
+    # Deletes start while the list is still downloading
+    ids = (document["_id"] for document in iter_list(api, path))
+    return run_concurrently(
+        label, ids, lambda _id: api.delete(f"{path}/{_id}"), workers=workers
+    )
+
+
+def delete_projects(api, workers=16):
+    return delete_listed(api, "/projects", "Deleting projects", workers)
+
+
+def delete_prizes(api, workers=16):
+    return delete_listed(api, "/prizes", "Deleting prizes", workers)
+
+
+def delete_schedule_items(api, workers=16):
+    return delete_listed(api, "/schedule", "Deleting schedule items", workers)
+
+
+def delete_check_in_items(api, workers=16):
+    return delete_listed(api, "/check-in", "Deleting check-in items", workers)
+
+
+def delete_teams(api, tokens, workers=16):
+    # There is no admin endpoint for deleting teams; a team is removed when
+    # its last member leaves, so every seeded user leaves their team
+    return run_concurrently(
+        "Leaving teams",
+        tokens,
+        lambda token: api.post("/team/leave", headers={"x-access-token": token}),
+        workers=workers,
+    )
+
+
+def delete_test_accounts(api, workers=16):
+    ids = (
+        user["_id"]
+        for user in iter_list(api, "/users")
+        if TEST_ACCOUNT_EMAIL.fullmatch(user.get("email", ""))
+    )
+    return run_concurrently(
+        "Deleting test accounts",
+        ids,
+        lambda _id: api.delete(f"/test-account/{_id}"),
+        workers=workers,
+    )
+
+
+def is_dev_database(name):
+    return DEV_DATABASE.search(name) is not None
+
+
+def fast_teardown(db, targets=None):
+    # Dev-only: deletes seeded data directly with delete_many, children
+    # before the documents they reference. Refuses anything but a dev db.
+    if not is_dev_database(db.name):
+        raise ValueError(f"Refusing to run a direct teardown against {db.name}")
+
+    test_user_ids = [
+        user["_id"]
+        for user in db["users"].find(
+            {"email": {"$regex": TEST_ACCOUNT_EMAIL.pattern}}, {"_id": 1}
+        )
+    ]
+    # Every checkin-item goes, so every check-in to one goes with it
+    item_ids = [item["_id"] for item in db["checkin-items"].find({}, {"_id": 1})]
+    steps = [
+        ("checkins", "checkins", {"user": {"$in": test_user_ids}}),
+        ("checkin-items", "checkins", {"item": {"$in": item_ids}}),
+        ("projects", "projects", {}),
+        ("teams", "teams", {"admin": {"$in": test_user_ids}}),
+        ("prizes", "prizes", {}),
+        ("checkin-items", "checkin-items", {}),
+        ("schedule-items", "schedule-items", {}),
+        ("test-accounts", "profiles", {"user": {"$in": test_user_ids}}),
+        ("test-accounts", "users", {"_id": {"$in": test_user_ids}}),
+    ]
+
+    deleted = {}
+    for target, collection, filter in steps:
+        if targets is not None and target not in targets:
+            continue
+        result = db[collection].delete_many(filter)
+        deleted[collection] = deleted.get(collection, 0) + result.deleted_count
+        print(f"Deleted {result.deleted_count} documents from {collection}")
+    return deleted
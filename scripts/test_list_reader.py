@@ -0,0 +1,45 @@
+import json
+import unittest
+
+from list_reader import iter_json_array
+
+
+def one_byte_chunks(data):
+    return [data[i : i + 1] for i in range(len(data))]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_one_byte_chunks(self):
+        values = [
+            1.5,
+            2e10,
+            -1.25e-3,
+            0,
+            12345,
+            True,
+            False,
+            None,
+            "é, ]\"x",
+            {"lat": 40.4433, "lng": -79.9436, "name": "Gates"},
+            [1, [2.5, 3]],
+        ]
+        for value in values:
+            with self.subTest(value=value):
+                data = json.dumps([value]).encode()
+                self.assertEqual(list(iter_json_array(one_byte_chunks(data))), [value])
+        data = json.dumps(values).encode()
+        self.assertEqual(list(iter_json_array(one_byte_chunks(data))), values)
+
+    def test_whole_body(self):
+        self.assertEqual(list(iter_json_array([b" [ ] "])), [])
+        self.assertEqual(list(iter_json_array([b"[1,2.5,3]"])), [1, 2.5, 3])
+
+    def test_malformed(self):
+        for data in [b"[1,2", b"[1.", b"{}", b"[{]"]:
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array(one_byte_chunks(data)))
+
+
+if __name__ == "__main__":
+    unittest.main()